@@ -0,0 +1,299 @@
+import argparse
+import json
+import os
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+import factors
+import metrics
+from cache import history_cache
+from historical import load_history, validate_ticker
+from indicators import INDICATORS, add_indicators
+from live import get_feed
+from prediction import process_data
+from signals import crossover_signals
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Headless HTTP service over the same loaders and caches as the Streamlit app.
+# Every endpoint takes one or many symbols and streams one chunk per symbol.
+INDICATOR_ALIASES = {
+    "MA": "Moving Average (MA)",
+    "RSI": "Relative Strength Index (RSI)",
+    "BB": "Bollinger Bands",
+    "MACD": "MACD",
+}
+MAX_SYMBOLS = int(os.getenv("MARKETMIND_API_MAX_SYMBOLS", "500"))
+
+
+class BadRequest(Exception):
+    pass
+
+
+def history_result(symbol, params):
+    result = load_history(symbol, params.get("period", "1y"), params.get("exchange", "NSE"), params.get("interval", "1d"))
+    if result.error:
+        raise LookupError(result.error)
+    return result
+
+
+def history_frame(symbol, params):
+    return history_result(symbol, params).hist
+
+
+def history_endpoint(symbol, params):
+    return history_frame(symbol, params)
+
+
+def indicator_names(params, default="MA"):
+    names = [INDICATOR_ALIASES.get(name.strip().upper(), name.strip()) for name in params.get("indicators", default).split(",") if name.strip()]
+    unknown = [name for name in names if name not in INDICATORS]
+    if unknown:
+        raise BadRequest(f"Unknown indicators: {', '.join(unknown)}")
+    return names
+
+
+def indicators_endpoint(symbol, params):
+    result = history_result(symbol, params)
+    if result.prices is not None:
+        hist = result.prices.frame(indicator_names(params))
+    else:
+        hist = add_indicators(result.hist, indicator_names(params))
+    return hist.drop(columns=['Open', 'High', 'Low', 'Volume'])
+
+
+def signals_endpoint(symbol, params):
+    hist = history_frame(symbol, params)
+    result = crossover_signals(hist['Close'].to_numpy(), int(params.get("fast", 50)), int(params.get("slow", 200)))
+    positions = np.concatenate([result.buy, result.sell])
+    return pd.DataFrame({
+        "side": ["buy"] * len(result.buy) + ["sell"] * len(result.sell),
+        "accuracy": result.accuracy,
+    }, index=hist.index[positions]).sort_index()
+
+
+def predict_endpoint(symbol, params):
+    hist, ticker_symbol, _, _, _ = history_result(symbol, params)
+    direction, _ = process_data(hist, lags=int(params.get("lags", 3)), ticker_symbol=ticker_symbol, period=params.get("period", "1y"))
+    return pd.DataFrame({"direction": [direction], "last_close": [hist['Close'].iloc[-1]]}, index=hist.index[-1:])
+
+
+def live_endpoint(symbol, params):
+    # Pass back the time of the last bar received as since= (epoch ms) to get only newer bars
+    is_valid, ticker_symbol = validate_ticker(symbol.strip().upper(), params.get("exchange", "NSE"))
+    if not is_valid:
+        raise LookupError(f"Invalid ticker '{ticker_symbol}'")
+    feed = get_feed(ticker_symbol, params.get("interval", "1m"), indicator_names(params, default=""))
+    since = pd.Timestamp(int(params["since"]), unit='ms', tz='UTC') if params.get("since") else None
+    return feed.snapshot(since)
+
+
+ENDPOINTS = {
+    "/history": history_endpoint,
+    "/indicators": indicators_endpoint,
+    "/signals": signals_endpoint,
+    "/predict": predict_endpoint,
+    "/live": live_endpoint,
+}
+
+
+def frame_json(frame):
+    # Column-oriented split layout with epoch-millisecond dates
+    return frame.to_json(orient='split', date_unit='ms', double_precision=6)
+
+
+def arrow_table(symbol, frame):
+    frame = frame.reset_index()
+    frame.insert(0, "symbol", symbol)
+    return pa.Table.from_pandas(frame, preserve_index=False)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "MarketMind"
+
+    def log_message(self, format, *args):
+        if os.getenv("MARKETMIND_API_LOG"):
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        self.dispatch(url.path, params)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            params = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self.send_json(400, {"error": "Body must be JSON"})
+        if isinstance(params.get("symbols"), list):
+            params["symbols"] = ",".join(params["symbols"])
+        self.dispatch(urlparse(self.path).path, {k: str(v) for k, v in params.items()})
+
+    def dispatch(self, path, params):
+        if path == "/healthz":
+            return self.send_json(200, {"status": "ok"})
+        if path == "/cache":
+            return self.send_json(200, history_cache.stats())
+        if path == "/metrics":
+            return self.send_metrics(params)
+        if path == "/screen":
+            return self.send_screen(params)
+        endpoint = ENDPOINTS.get(path)
+        if endpoint is None:
+            return self.send_json(404, {"error": f"Unknown endpoint '{path}'", "endpoints": sorted(ENDPOINTS)})
+        metrics.start_trace()
+        metrics.inc("api_requests", endpoint=path)
+        with metrics.span("api", endpoint=path):
+            self.serve_endpoint(endpoint, params)
+
+    def serve_endpoint(self, endpoint, params):
+        symbols = [s.strip() for s in params.get("symbols", params.get("symbol", "")).split(",") if s.strip()]
+        if not symbols:
+            return self.send_json(400, {"error": "Pass one or more symbols with ?symbols=TCS,INFY"})
+        if len(symbols) > MAX_SYMBOLS:
+            return self.send_json(400, {"error": f"At most {MAX_SYMBOLS} symbols per request"})
+        if params.get("format") == "arrow":
+            if pa is None:
+                return self.send_json(406, {"error": "Arrow output needs pyarrow installed"})
+            return self.stream_arrow(endpoint, symbols, params)
+        self.stream_json(endpoint, symbols, params)
+
+    def send_metrics(self, params):
+        # Prometheus text by default, ?format=json for the raw snapshot
+        if params.get("format") == "json":
+            return self.send_json(200, metrics.snapshot())
+        body = metrics.prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_screen(self, params):
+        # ?filters=rsi14<30;close>sma200&order=rsi14&limit=20, answered from the factor table alone
+        table = factors.load_table(params.get("exchange", "NSE"))
+        if table is None:
+            return self.send_json(503, {"error": "No factor table yet; run python factors.py build"})
+        try:
+            result = table.query(factors.parse_filters(params.get("filters", "")), params.get("order"),
+                                 params.get("ascending", "true").lower() != "false", int(params.get("limit", 50)))
+        except ValueError as e:
+            return self.send_json(400, {"error": str(e)})
+        body = ('{"as_of":' + json.dumps(table.meta["as_of"]) + ',"data":' + result.to_json(orient='split', index=False, double_precision=6) + '}').encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def start_stream(self, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def write_chunk(self, data):
+        if data:
+            self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+
+    def end_stream(self):
+        self.wfile.write(b"0\r\n\r\n")
+
+    def results(self, endpoint, symbols, params):
+        for symbol in symbols:
+            try:
+                yield symbol, endpoint(symbol, params), None
+            except Exception as e:
+                yield symbol, None, str(e)
+
+    def stream_json(self, endpoint, symbols, params):
+        # {"data": {"TCS": {...split frame...}, ...}, "errors": {...}} written symbol by symbol
+        self.start_stream("application/json")
+        self.write_chunk(b'{"data":{')
+        errors = {}
+        first = True
+        for symbol, frame, error in self.results(endpoint, symbols, params):
+            if error:
+                errors[symbol] = error
+                continue
+            self.write_chunk(("" if first else ",").encode() + json.dumps(symbol).encode() + b":" + frame_json(frame).encode())
+            first = False
+        self.write_chunk(b'},"errors":' + json.dumps(errors, separators=(",", ":")).encode() + b"}")
+        self.end_stream()
+
+    def stream_arrow(self, endpoint, symbols, params):
+        # One IPC stream; the schema comes from the first symbol that succeeds
+        self.start_stream("application/vnd.apache.arrow.stream")
+        sink = ChunkSink(self)
+        writer = None
+        for symbol, frame, error in self.results(endpoint, symbols, params):
+            if error:
+                continue
+            table = arrow_table(symbol, frame)
+            if writer is None:
+                writer = pa.ipc.new_stream(sink, table.schema)
+            writer.write_table(table.cast(writer.schema))
+        if writer is not None:
+            writer.close()
+        self.end_stream()
+
+
+class ChunkSink:
+    def __init__(self, handler):
+        self.handler = handler
+        self.closed = False
+
+    def write(self, data):
+        self.handler.write_chunk(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def serve(host="127.0.0.1", port=8600, workers=1):
+    server = ThreadingHTTPServer((host, port), Handler)
+    # Pre-fork workers that accept on the shared listening socket
+    for _ in range(workers - 1 if hasattr(os, "fork") else 0):
+        if os.fork() == 0:
+            break
+    print(f"MarketMind API (pid {os.getpid()}) listening on http://{host}:{port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve MarketMind history, indicators, signals and predictions over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes sharing the port")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,27 @@
 import streamlit as st
-import plotly.graph_objs as go
-from fundamental import perform_fundamental_analysis
-from sentiment import perform_sentiment_analysis
-from indicators import add_indicators
-from historical import get_historical_data
+import llm
+
+# .env is read on the first run of the process only, before other modules read their settings
+llm.load_env()
+
+from indicators import add_indicators, IndicatorEngine
+from frames import PriceFrame
+from signals import crossover_signals
+from backtest import backtest_signals
+from historical import get_historical_data, validate_ticker
+from cache import history_cache
+from fetcher import scheduler
+from symbols import get_symbol_master
+import pandas as pd
 import hashlib
 import time
+from executor import AnalysisBatch, HISTORY_TIMEOUT, LLM_TIMEOUT
+import metrics
+import panels
+
+# Every span recorded during this rerun, including in worker threads, carries this trace id
+trace_id = metrics.start_trace()
+rerun_start = time.perf_counter()
 
 # Set page configuration
 st.set_page_config(
@@ -83,13 +99,37 @@ st.markdown("<h1 class='title'>Market Mind: Indian Stock Analyzer 📈</h1>", un
 # Sidebar for preferences
 with st.sidebar:
     st.markdown("### Analysis Options")
+    mode = st.radio("Mode", ["Single Stock", "Watchlist Screener", "Live Intraday"], help="Analyze one symbol, screen a watchlist or watch intraday bars.")
     exchange = st.radio("Select Exchange", ["NSE", "BSE"], help="Choose the stock exchange.")
+    if mode == "Watchlist Screener":
+        default_watchlist = ", ".join(get_symbol_master().symbols(exchange))
+        watchlist = st.text_area("Watchlist", value=default_watchlist, help="Comma or newline separated symbols.")
+        run_screener_button = st.button("Run Screener", key="run_screener")
     symbol = st.text_input("Enter Stock Symbol", placeholder="e.g., RELIANCE, TCS")
+    if symbol:
+        symbol_master = get_symbol_master()
+        query = symbol.strip().replace("$", "").upper()
+        if not symbol_master.contains(query, exchange):
+            suggestions = symbol_master.search(query, exchange)
+            if suggestions:
+                st.caption(f"Did you mean: {', '.join(suggestions)}")
+    if mode == "Live Intraday":
+        live_interval = st.selectbox("Bar Interval", ["1m", "5m"], help="Intraday bar size; new bars are polled in the background.")
     time_frame = st.selectbox("Select Time Frame", ["1mo", "6mo", "1y", "5y", "max"], help="Select data duration.")
+    bar_size = "1d"
+    if mode == "Single Stock":
+        bar_size = st.selectbox("Bar Size", ["1d", "1wk", "1mo"], format_func=lambda size: {"1d": "Daily", "1wk": "Weekly", "1mo": "Monthly"}[size],
+                                help="Weekly and monthly bars are built from the daily history already loaded.")
     indicators = st.multiselect("Select Indicators", ["Moving Average (MA)", "Relative Strength Index (RSI)", "Bollinger Bands", "MACD"], default=["Moving Average (MA)"], help="Choose technical indicators.")
     show_chart = st.checkbox("Show Price Chart", value=True)
     show_volume = st.checkbox("Show Volume Chart")
     show_sentiment = st.checkbox("Show Sentiment Analysis", value=True)
+    if show_sentiment:
+        default_backend = panels.load("sentiment", "SENTIMENT_BACKEND")
+        sentiment_backend = st.selectbox(
+            "Sentiment Engine", ["groq", "local"], index=1 if default_backend == "local" else 0,
+            format_func=lambda backend: {"groq": "Groq LLM", "local": "Local news feed (offline)"}[backend],
+            help="The local engine scores headlines from the news feed on disk in milliseconds.")
     show_fundamental = st.checkbox("Show Fundamental Analysis")
     show_historical_data = st.checkbox("Show Historical Data")
     show_prediction = st.checkbox("Show Prediction Results")
@@ -97,6 +137,29 @@ with st.sidebar:
     st.markdown("---")
     st.markdown(f"**Selected:** {symbol} on {exchange} ({time_frame})")
 
+# Screens the whole exchange from the end-of-day factor table; no downloads
+with st.sidebar.expander("Factor Screener"):
+    if st.checkbox("Enable factor screener", key="factor_screener"):
+        factors = panels.load("factors")
+        table = factors.load_table(exchange)
+        if table is None:
+            st.info(f"No {exchange} factor table yet. Run: python factors.py build --exchange {exchange}", icon="ℹ️")
+        else:
+            st.caption(f"{len(table)} symbols as of {table.meta['as_of']}")
+            if table.meta.get("failed"):
+                st.caption(f"Missing from the last build: {', '.join(sorted(table.meta['failed']))}")
+            factor_filters = st.text_area("Filters", value="rsi14 < 30\nclose > sma200", help="One per line: factor, operator, and a number, another factor or a label (signal == Buy).")
+            factor_order = st.selectbox("Rank By", factors.NUMERIC_FACTORS, index=factors.NUMERIC_FACTORS.index("rsi14"))
+            factor_descending = st.checkbox("Highest first")
+            factor_limit = st.number_input("Top N", min_value=1, max_value=500, value=20)
+            try:
+                factor_query = factors.parse_filters(factor_filters)
+                shown = {name for name, _, value in factor_query} | {value for _, _, value in factor_query if value in factors.NUMERIC_FACTORS} | {factor_order}
+                st.dataframe(table.query(factor_query, factor_order, not factor_descending, int(factor_limit), columns=shown),
+                             use_container_width=True, hide_index=True)
+            except ValueError as e:
+                st.error(str(e), icon="⚠️")
+
 # Initialize session state
 if 'fig' not in st.session_state:
     st.session_state['fig'] = None
@@ -104,177 +167,234 @@ if 'chart_key' not in st.session_state:
     st.session_state['chart_key'] = None
 if 'sentiment_data' not in st.session_state:
     st.session_state['sentiment_data'] = {"symbol": "", "sentiment": "", "headlines": []}
+if 'indicator_engine' not in st.session_state:
+    st.session_state['indicator_engine'] = IndicatorEngine([])
 if 'error' not in st.session_state:
     st.session_state['error'] = None
 if 'warning' not in st.session_state:
     st.session_state['warning'] = None
 
+# Render the price-based panels once the history task finishes
+def render_history(hist, chart_slot, volume_slot, signals_slot, data_slot):
+    if 'error' in st.session_state and st.session_state['error']:
+        chart_slot.error(st.session_state['error'], icon="⚠️")
+        return
+    if hist.empty:
+        chart_slot.warning(f"No data available for '{symbol}' on {exchange}. Please check the symbol or try again.", icon="⚠️")
+        return
+    if isinstance(hist, PriceFrame):
+        hist = hist.frame(indicators)
+    else:
+        hist = add_indicators(hist, indicators, engine=st.session_state['indicator_engine'])
+
+    # Function to generate unique chart key
+    def generate_chart_key():
+        key_source = f"{exchange}_{symbol}_{time_frame}_{bar_size}_{'_'.join(indicators)}_{len(hist)}_{hist.index[-1]}"
+        return hashlib.md5(key_source.encode()).hexdigest()
+
+    # Function to update price chart
+    def update_chart():
+        if hist.empty or 'Close' not in hist.columns:
+            st.error("No valid price data to render chart.", icon="⚠️")
+            return None
+        cached_figure, price_figure = panels.load("charts", "cached_figure", "price_figure")
+        return cached_figure(generate_chart_key(), lambda: price_figure(hist, symbol, indicators))
+
+    # Function to plot volume chart
+    def plot_volume_chart():
+        if hist.empty or 'Volume' not in hist.columns:
+            st.error("No valid volume data to render chart.", icon="⚠️")
+            return None
+        cached_figure, volume_figure = panels.load("charts", "cached_figure", "volume_figure")
+        return cached_figure(f"{generate_chart_key()}_volume", lambda: volume_figure(hist, symbol))
+
+    if show_chart:
+        with chart_slot.container():
+            st.markdown("### Price Chart")
+            st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+            if update_chart_button or st.session_state['fig'] is None:
+                st.session_state['chart_key'] = generate_chart_key()
+                st.session_state['fig'] = update_chart()
+            if st.session_state['fig']:
+                st.plotly_chart(st.session_state['fig'], use_container_width=True, key=st.session_state['chart_key'])
+            else:
+                st.error("Failed to render price chart. Check data or indicators.", icon="⚠️")
+            if 'warning' in st.session_state and st.session_state['warning']:
+                st.warning(st.session_state['warning'], icon="⚠️")
+
+    if show_volume:
+        with volume_slot.container():
+            st.markdown("### Trading Volume")
+            st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+            volume_fig = plot_volume_chart()
+            if volume_fig:
+                st.plotly_chart(volume_fig, use_container_width=True)
+            else:
+                st.error("Failed to render volume chart. Check data.", icon="⚠️")
+
+    if show_prediction:
+        with signals_slot.container():
+            st.markdown("### Trading Signals")
+            st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+            with metrics.span("signals"):
+                signals = crossover_signals(hist['Close'].to_numpy())
+            buy_signals, sell_signals, accuracy_percentage = hist.index[signals.buy], hist.index[signals.sell], signals.accuracy
+            if len(buy_signals) or len(sell_signals):
+                for buy_signal in buy_signals:
+                    st.markdown(f"**📈 Buy** at {buy_signal.strftime('%Y-%m-%d')} (Accuracy: {accuracy_percentage:.2f}%)")
+                for sell_signal in sell_signals:
+                    st.markdown(f"**📉 Sell** at {sell_signal.strftime('%Y-%m-%d')} (Accuracy: {accuracy_percentage:.2f}%)")
+                with metrics.span("backtest"):
+                    backtest = backtest_signals(hist['Close'].to_numpy(), signals)
+                st.caption(f"Backtest: return {backtest['total_return'] * 100:.1f}%, max drawdown {backtest['max_drawdown'] * 100:.1f}%, hit rate {backtest['hit_rate'] * 100:.1f}%")
+            else:
+                st.info("No trading signals generated.", icon="ℹ️")
+
+    if show_historical_data:
+        with data_slot.container():
+            st.markdown("### Historical Data")
+            st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+            st.dataframe(hist, use_container_width=True)
+
+def render_sentiment(sentiment_data, slot):
+    with slot.container():
+        st.markdown("### Sentiment Analysis")
+        st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+        if 'error' in sentiment_data:
+            st.error(sentiment_data['error'], icon="⚠️")
+            return
+        st.markdown(f"**Sentiment:** {sentiment_data['sentiment']}")
+        for headline in sentiment_data['headlines']:
+            st.markdown(f"- {headline}")
+        daily = sentiment_data.get('daily')
+        if daily is not None and len(daily) > 1:
+            st.caption("Daily headline sentiment")
+            st.line_chart(daily['score'], height=150)
+
+def render_fundamental(fundamental_analysis, slot):
+    with slot.container():
+        st.markdown("### Fundamental Analysis")
+        st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+        st.markdown(fundamental_analysis)
+
+# Screen the watchlist, adding rows to the table as each batch finishes
+if mode == "Watchlist Screener":
+    st.markdown("### Watchlist Screener")
+    st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+    symbols = [s for s in watchlist.replace("\n", ",").split(",") if s.strip()]
+    if run_screener_button and symbols:
+        run_screener, screener_batch_size = panels.load("screener", "run_screener", "BATCH_SIZE")
+        table_slot = st.empty()
+        progress = st.progress(0.0, text="Screening watchlist...")
+        results = []
+        total_batches = -(-len(symbols) // screener_batch_size)
+        skipped = []
+        for done, batch in enumerate(run_screener(symbols, exchange, time_frame), start=1):
+            results.append(batch.table)
+            if batch.error:
+                st.warning(f"Skipped {', '.join(batch.skipped)}: {batch.error}", icon="⚠️")
+            else:
+                skipped.extend(batch.skipped)
+            st.session_state['screener_results'] = pd.concat(results, ignore_index=True)
+            table_slot.dataframe(st.session_state['screener_results'], use_container_width=True, hide_index=True)
+            progress.progress(min(done / total_batches, 1.0), text=f"Screened {done} of {total_batches} batches")
+        progress.empty()
+        if skipped:
+            st.caption(f"No data for {', '.join(skipped)}")
+    elif st.session_state.get('screener_results') is not None:
+        st.dataframe(st.session_state['screener_results'], use_container_width=True, hide_index=True)
+    else:
+        st.info("Enter a watchlist and click Run Screener.", icon="ℹ️")
+
+# Live intraday chart: only this fragment reruns, redrawing from the shared ring buffer
+elif mode == "Live Intraday" and symbol:
+    is_valid, live_ticker = validate_ticker(symbol.strip().replace("$", "").upper(), exchange)
+    get_feed, live_poll_seconds = panels.load("live", "get_feed", "POLL_SECONDS")
+    cached_figure, price_figure = panels.load("charts", "cached_figure", "price_figure")
+
+    @st.fragment(run_every=live_poll_seconds)
+    def live_panel():
+        try:
+            feed = get_feed(live_ticker, live_interval, indicators)
+        except Exception as e:
+            st.error(f"Error starting live data for '{live_ticker}': {e}", icon="⚠️")
+            return
+        hist = feed.snapshot()
+        st.markdown(f"### Live {live_interval} Chart")
+        st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
+        if hist.empty:
+            st.info("No intraday bars yet. The market may be closed.", icon="ℹ️")
+            return
+
+        def build():
+            fig = price_figure(hist, symbol, indicators)
+            # Keep the viewer's zoom and pan across refreshes
+            fig.update_layout(uirevision=feed.key, xaxis_rangeslider_visible=False)
+            return fig
+
+        fig = cached_figure(("live",) + feed.key + (feed.version,), build)
+        st.plotly_chart(fig, use_container_width=True, key="live_chart")
+        st.caption(f"Last close {hist['Close'].iloc[-1]:.2f} at {hist.index[-1].strftime('%H:%M')}, {len(hist)} bars in memory")
+        if feed.error:
+            st.warning(f"Live update failed, retrying: {feed.error}", icon="⚠️")
+
+    if not is_valid:
+        st.error(f"Invalid ticker '{live_ticker}'. It may not exist on {exchange}.", icon="🚫")
+    else:
+        live_panel()
+
 # Fetch and analyze stock data
-if symbol:
+elif symbol:
     if exchange.lower() not in ["nse", "bse"]:
         st.error("Please select either 'NSE' or 'BSE'.", icon="🚫")
     else:
         with st.spinner(f"Analyzing {symbol} on {exchange}..."):
-            start_time = time.time()
-            hist = get_historical_data(symbol, time_frame, exchange)
-            if 'error' in st.session_state and st.session_state['error']:
-                st.error(st.session_state['error'], icon="⚠️")
-            elif hist.empty:
-                st.warning(f"No data available for '{symbol}' on {exchange}. Please check the symbol or try again.", icon="⚠️")
-            else:
-                hist = add_indicators(hist, indicators)
-
-                # Function to generate unique chart key
-                def generate_chart_key():
-                    key_source = f"{exchange}_{symbol}_{time_frame}_{'_'.join(indicators)}"
-                    return hashlib.md5(key_source.encode()).hexdigest()
-
-                # Function to update price chart
-                def update_chart():
-                    if hist.empty or 'Close' not in hist.columns:
-                        st.error("No valid price data to render chart.", icon="⚠️")
-                        return go.Figure()
-                    fig = go.Figure(data=[go.Candlestick(
-                        x=hist.index,
-                        open=hist['Open'],
-                        high=hist['High'],
-                        low=hist['Low'],
-                        close=hist['Close'],
-                        name='Candlestick',
-                        increasing_line_color='#22C55E',
-                        decreasing_line_color='#EF4444'
-                    )])
-                    if "Moving Average (MA)" in indicators and 'MA' in hist.columns:
-                        fig.add_trace(go.Scatter(x=hist.index, y=hist['MA'], mode='lines', name='MA', line=dict(color='#10B981')))
-                    if "Relative Strength Index (RSI)" in indicators and 'RSI' in hist.columns:
-                        fig.add_trace(go.Scatter(x=hist.index, y=hist['RSI'], mode='lines', name='RSI', line=dict(color='#F59E0B'), yaxis="y2"))
-                    if "Bollinger Bands" in indicators and all(x in hist.columns for x in ['BB_Upper', 'BB_Lower']):
-                        fig.add_trace(go.Scatter(x=hist.index, y=hist['BB_Upper'], mode='lines', name='BB Upper', line=dict(color='#3B82F6', dash='dash')))
-                        fig.add_trace(go.Scatter(x=hist.index, y=hist['BB_Lower'], mode='lines', name='BB Lower', line=dict(color='#3B82F6', dash='dash')))
-                    if "MACD" in indicators and 'MACD' in hist.columns:
-                        fig.add_trace(go.Scatter(x=hist.index, y=hist['MACD'], mode='lines', name='MACD', line=dict(color='#EC4899'), yaxis="y3"))
-                    
-                    fig.update_layout(
-                        title=f"{symbol} Price Chart",
-                        xaxis_title="Date",
-                        yaxis_title="Price (INR)",
-                        template="plotly_dark",
-                        xaxis_rangeslider_visible=True,
-                        yaxis=dict(gridcolor='#374151'),
-                        plot_bgcolor='#181825',
-                        paper_bgcolor='#181825',
-                        font=dict(color='#D4D4D8'),
-                        showlegend=True,
-                        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-                        yaxis2=dict(title="RSI", overlaying="y", side="right", showgrid=False, range=[0, 100]),
-                        yaxis3=dict(title="MACD", overlaying="y", side="right", showgrid=False, anchor="free", position=0.95)
-                    )
-                    return fig
-
-                # Function to plot volume chart
-                def plot_volume_chart():
-                    if hist.empty or 'Volume' not in hist.columns:
-                        st.error("No valid volume data to render chart.", icon="⚠️")
-                        return go.Figure()
-                    fig = go.Figure(data=[go.Bar(
-                        x=hist.index,
-                        y=hist['Volume'],
-                        name='Volume',
-                        marker_color='#3B82F6'
-                    )])
-                    fig.update_layout(
-                        title=f"{symbol} Trading Volume",
-                        xaxis_title="Date",
-                        yaxis_title="Volume",
-                        template="plotly_dark",
-                        plot_bgcolor='#181825',
-                        paper_bgcolor='#181825',
-                        font=dict(color='#D4D4D8'),
-                        yaxis=dict(gridcolor='#374151')
-                    )
-                    return fig
-
-                # Determine buy/sell signals
-                def determine_signals(hist):
-                    buy_signals = []
-                    sell_signals = []
-                    accuracy_count = 0
-                    if len(hist) < 50 or 'Close' not in hist.columns:
-                        return buy_signals, sell_signals, 0.0
-                    hist['SMA50'] = hist['Close'].rolling(window=50, min_periods=1).mean()
-                    hist['SMA200'] = hist['Close'].rolling(window=200, min_periods=1).mean()
-                    for i in range(1, len(hist)):
-                        if hist['SMA50'].iloc[i-1] < hist['SMA200'].iloc[i-1] and hist['SMA50'].iloc[i] > hist['SMA200'].iloc[i]:
-                            buy_signals.append(hist.index[i])
-                        elif hist['SMA50'].iloc[i-1] > hist['SMA200'].iloc[i-1] and hist['SMA50'].iloc[i] < hist['SMA200'].iloc[i]:
-                            sell_signals.append(hist.index[i])
-                        if (i > 1 and (hist['Close'].iloc[i] > hist['Close'].iloc[i-1]) and hist.index[i-1] in buy_signals) or \
-                           (i > 1 and (hist['Close'].iloc[i] < hist['Close'].iloc[i-1]) and hist.index[i-1] in sell_signals):
-                            accuracy_count += 1
-                    accuracy_percentage = accuracy_count / (len(buy_signals) + len(sell_signals)) * 100 if (len(buy_signals) + len(sell_signals)) > 0 else 0.0
-                    return buy_signals, sell_signals, accuracy_percentage
-
-                # Layout with columns
-                col1, col2 = st.columns([2, 1])
-
-                with col1:
-                    if show_chart:
-                        st.markdown("### Price Chart")
-                        st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
-                        if update_chart_button or st.session_state['fig'] is None:
-                            st.session_state['chart_key'] = generate_chart_key()
-                            st.session_state['fig'] = update_chart()
-                        if st.session_state['fig']:
-                            st.plotly_chart(st.session_state['fig'], use_container_width=True, key=st.session_state['chart_key'])
-                        else:
-                            st.error("Failed to render price chart. Check data or indicators.", icon="⚠️")
-                        if 'warning' in st.session_state and st.session_state['warning']:
-                            st.warning(st.session_state['warning'], icon="⚠️")
-
-                    if show_volume:
-                        st.markdown("### Trading Volume")
-                        st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
-                        volume_fig = plot_volume_chart()
-                        if volume_fig:
-                            st.plotly_chart(volume_fig, use_container_width=True)
-                        else:
-                            st.error("Failed to render volume chart. Check data.", icon="⚠️")
-
-                with col2:
-                    if show_prediction:
-                        st.markdown("### Trading Signals")
-                        st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
-                        buy_signals, sell_signals, accuracy_percentage = determine_signals(hist)
-                        if buy_signals or sell_signals:
-                            for buy_signal in buy_signals:
-                                st.markdown(f"**📈 Buy** at {buy_signal.strftime('%Y-%m-%d')} (Accuracy: {accuracy_percentage:.2f}%)")
-                            for sell_signal in sell_signals:
-                                st.markdown(f"**📉 Sell** at {sell_signal.strftime('%Y-%m-%d')} (Accuracy: {accuracy_percentage:.2f}%)")
-                        else:
-                            st.info("No trading signals generated.", icon="ℹ️")
-
-                    if show_sentiment:
-                        with st.spinner("Analyzing sentiment..."):
-                            st.markdown("### Sentiment Analysis")
-                            st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
-                            if st.session_state['sentiment_data']['symbol'] != symbol:
-                                st.session_state['sentiment_data'] = perform_sentiment_analysis(symbol)
-                            sentiment_data = st.session_state['sentiment_data']
-                            st.markdown(f"**Sentiment:** {sentiment_data['sentiment']}")
-                            for headline in sentiment_data['headlines']:
-                                st.markdown(f"- {headline}")
-
-                    if show_fundamental:
-                        with st.spinner("Analyzing fundamentals..."):
-                            st.markdown("### Fundamental Analysis")
-                            st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
-                            fundamental_analysis = perform_fundamental_analysis(symbol)
-                            st.markdown(fundamental_analysis)
-
-                if show_historical_data:
-                    st.markdown("### Historical Data")
-                    st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
-                    st.dataframe(hist, use_container_width=True)
+            # Start every enabled analysis at once; a symbol change cancels the previous batch
+            batch_key = (exchange, symbol, time_frame, bar_size)
+            previous_batch = st.session_state.get('analysis_batch')
+            if previous_batch is not None and previous_batch.key != batch_key:
+                previous_batch.cancel()
+            batch = AnalysisBatch(batch_key)
+            batch.start("history", get_historical_data, symbol, time_frame, exchange, bar_size, timeout=HISTORY_TIMEOUT)
+            cached_sentiment = st.session_state['sentiment_data']
+            if show_sentiment and (cached_sentiment.get('symbol') != symbol or cached_sentiment.get('backend', 'groq') != sentiment_backend):
+                batch.start("sentiment", panels.load("sentiment", "perform_sentiment_analysis"), symbol, sentiment_backend, timeout=LLM_TIMEOUT)
+            if show_fundamental:
+                batch.start("fundamental", panels.load("fundamental", "perform_fundamental_analysis"), symbol, timeout=LLM_TIMEOUT)
+            st.session_state['analysis_batch'] = batch
+
+            # Layout with columns; each panel is filled in as its task finishes
+            col1, col2 = st.columns([2, 1])
+            with col1:
+                chart_slot = st.empty()
+                volume_slot = st.empty()
+            with col2:
+                signals_slot = st.empty()
+                sentiment_slot = st.empty()
+                fundamental_slot = st.empty()
+            data_slot = st.empty()
+
+            if show_sentiment:
+                if "sentiment" in batch.futures:
+                    sentiment_slot.info("Analyzing sentiment...", icon="⏳")
+                else:
+                    render_sentiment(st.session_state['sentiment_data'], sentiment_slot)
+            if show_fundamental:
+                fundamental_slot.info("Analyzing fundamentals...", icon="⏳")
+
+            for name, result, error in batch.as_completed():
+                if name == "history":
+                    if error is not None:
+                        st.session_state['error'] = f"Error fetching data for '{symbol}': {error}"
+                        result = pd.DataFrame()
+                    render_history(result, chart_slot, volume_slot, signals_slot, data_slot)
+                elif name == "sentiment":
+                    sentiment_data = result if error is None else {"error": f"Error performing sentiment analysis: {error}"}
+                    if 'error' not in sentiment_data:
+                        st.session_state['sentiment_data'] = dict(sentiment_data, backend=sentiment_backend)
+                    render_sentiment(sentiment_data, sentiment_slot)
+                elif name == "fundamental":
+                    render_fundamental(result if error is None else f"Error generating fundamental analysis: {error}", fundamental_slot)
 
             if 'warning' in st.session_state and st.session_state['warning'] and not show_chart:
                 st.warning(st.session_state['warning'], icon="⚠️")
@@ -282,6 +402,33 @@ if symbol:
 else:
     st.info("Enter a stock symbol to begin analysis.", icon="ℹ️")
 
+# Shared data cache counters
+with st.sidebar.expander("Data Cache"):
+    st.json(history_cache.stats())
+    for host, state in scheduler.status().items():
+        st.caption(f"{host}: circuit {state}")
+
+# Where this rerun's time went, plus process-wide counters
+metrics.observe("rerun", time.perf_counter() - rerun_start)
+with st.sidebar.expander("Debug Metrics"):
+    run_spans = metrics.trace_spans(trace_id)
+    if run_spans:
+        st.dataframe(pd.DataFrame(
+            [{"stage": name + "".join(f" [{v}]" for v in labels.values()), "ms": round(seconds * 1000, 1)} for name, labels, seconds in run_spans]
+        ), use_container_width=True, hide_index=True)
+    snapshot = metrics.snapshot()
+    if snapshot["spans"]:
+        st.markdown("**All sessions**")
+        st.dataframe(pd.DataFrame(
+            [{"stage": s["name"] + "".join(f" [{v}]" for v in s["labels"].values()), "count": s["count"],
+              "mean ms": round(s["sum"] / s["count"] * 1000, 1), "max ms": round(s["max"] * 1000, 1)} for s in snapshot["spans"]]
+        ), use_container_width=True, hide_index=True)
+    for counter in snapshot["counters"]:
+        st.caption(f"{counter['name']}{''.join(f' [{v}]' for v in counter['labels'].values())}: {counter['value']}")
+    for key, panel in panels.panels().items():
+        seconds = panels.import_times().get(key)
+        st.caption(f"{panel.title}: " + (f"loaded in {seconds * 1000:.0f} ms" if seconds is not None else "loaded" if panels.is_loaded(key) else "not loaded"))
+
 # Footer
 st.sidebar.markdown("---")
 st.sidebar.markdown("**Market Mind 2024** | Created by Dev.off()")
\ No newline at end of file
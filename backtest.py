@@ -0,0 +1,198 @@
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import store
+
+# Backtests for the SMA crossover strategy. A whole (fast x slow) grid is
+# evaluated at once with broadcasting; tickers are spread over processes and
+# results are cached on disk by (ticker, data hash, params).
+TRADING_DAYS = 252
+METRICS = ['total_return', 'sharpe', 'max_drawdown', 'hit_rate', 'turnover']
+CACHE_DIR = os.path.join(store.STORE_DIR, "backtests")
+
+
+def sma_matrix(close, windows):
+    # (windows x bars) simple moving averages with min_periods=1, like signals.rolling_mean
+    close = np.asarray(close, dtype='float64')
+    windows = np.asarray(windows)[:, None]
+    csum = np.concatenate([[0.0], np.cumsum(close)])
+    idx = np.arange(1, len(close) + 1)[None, :]
+    lower = np.maximum(idx - windows, 0)
+    return (csum[idx] - csum[lower]) / (idx - lower)
+
+
+def positions_from_events(events):
+    # events[..., t] is 1 on a buy bar, -1 on a sell bar; long from each buy until the next sell, flat otherwise
+    n = events.shape[-1]
+    last_event = np.maximum.accumulate(np.where(events != 0, np.arange(n), -1), axis=-1)
+    held = np.take_along_axis(events, np.maximum(last_event, 0), axis=-1) > 0
+    return (held & (last_event >= 0)).astype('float64')
+
+
+def positions_from_signals(n, buy, sell):
+    events = np.zeros(n)
+    events[buy] = 1
+    events[sell] = -1
+    return positions_from_events(events)
+
+
+def crossover_events(fast, slow):
+    # Strict sign changes of fast - slow along the last axis, as in signals.crossover_points
+    spread = fast - slow
+    prev, cur = spread[..., :-1], spread[..., 1:]
+    events = np.zeros(spread.shape, dtype='int8')
+    events[..., 1:] = ((prev < 0) & (cur > 0)).astype('int8') - ((prev > 0) & (cur < 0))
+    return events
+
+
+def evaluate(close, position, start=0, cost=0.0):
+    # position[..., t] is held over the return from bar t to t+1; metrics cover bars from start on
+    close = np.asarray(close, dtype='float64')
+    returns = close[1:] / close[:-1] - 1
+    held = position[..., :-1]
+    trades = np.abs(np.diff(position, axis=-1, prepend=0.0))[..., :-1]
+    strategy = held * returns - cost * trades
+    strategy, held, trades = strategy[..., start:], held[..., start:], trades[..., start:]
+    bars = strategy.shape[-1]
+    if bars == 0:
+        shape = position.shape[:-1]
+        return {metric: np.full(shape, np.nan) for metric in METRICS}
+    equity = np.cumprod(1 + strategy, axis=-1)
+    peak = np.maximum.accumulate(equity, axis=-1)
+    in_market = held.sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std = strategy.std(axis=-1)
+        return {
+            'total_return': equity[..., -1] - 1,
+            'sharpe': np.where(std > 0, strategy.mean(axis=-1) / std * np.sqrt(TRADING_DAYS), 0.0),
+            'max_drawdown': (1 - equity / peak).max(axis=-1),
+            'hit_rate': np.where(in_market > 0, ((strategy > 0) & (held > 0)).sum(axis=-1) / in_market, np.nan),
+            'turnover': trades.sum(axis=-1) / bars,
+        }
+
+
+def backtest_signals(close, signals, cost=0.0):
+    # Single run on a signals.SignalResult, e.g. the one shown in the app
+    position = positions_from_signals(len(close), signals.buy, signals.sell)
+    results = evaluate(close, position, cost=cost)
+    equity = np.concatenate([[1.0], np.cumprod(1 + position[:-1] * (np.asarray(close[1:]) / close[:-1] - 1))])
+    return {**{k: float(v) for k, v in results.items()}, 'equity': equity}
+
+
+def grid_backtest(close, fast_windows, slow_windows, start=0, cost=0.0, chunk_size=10):
+    close = np.asarray(close, dtype='float64')
+    fast_windows, slow_windows = np.asarray(fast_windows), np.asarray(slow_windows)
+    slow = sma_matrix(close, slow_windows)[None, :, :]
+    results = {metric: np.empty((len(fast_windows), len(slow_windows))) for metric in METRICS}
+    # Chunk over fast windows to keep the (fast x slow x bars) cube within memory
+    for i in range(0, len(fast_windows), chunk_size):
+        fast = sma_matrix(close, fast_windows[i:i + chunk_size])[:, None, :]
+        chunk = evaluate(close, positions_from_events(crossover_events(fast, slow)), start=start, cost=cost)
+        for metric in METRICS:
+            results[metric][i:i + chunk_size] = chunk[metric]
+    invalid = fast_windows[:, None] >= slow_windows[None, :]
+    for metric in METRICS:
+        results[metric][invalid] = np.nan
+    return results
+
+
+def best_params(results, fast_windows, slow_windows, metric='sharpe'):
+    scores = np.where(np.isnan(results[metric]), -np.inf, results[metric])
+    if metric == 'max_drawdown':
+        scores = np.where(np.isnan(results[metric]), -np.inf, -results[metric])
+    i, j = np.unravel_index(np.argmax(scores), scores.shape)
+    return int(fast_windows[i]), int(slow_windows[j])
+
+
+def walk_forward(close, fast_windows, slow_windows, train=3 * TRADING_DAYS, test=TRADING_DAYS, metric='sharpe', cost=0.0):
+    # Pick the best pair on each training window, then score it on the following unseen window
+    close = np.asarray(close, dtype='float64')
+    folds = []
+    for test_start in range(train, len(close) - 1, test):
+        test_end = min(test_start + test, len(close))
+        in_sample = grid_backtest(close[:test_start], fast_windows, slow_windows, start=test_start - train, cost=cost)
+        fast, slow = best_params(in_sample, fast_windows, slow_windows, metric)
+        out_sample = grid_backtest(close[:test_end], [fast], [slow], start=test_start - 1, cost=cost)
+        folds.append({
+            'train_start': test_start - train, 'test_start': test_start, 'test_end': test_end,
+            'fast': fast, 'slow': slow, **{m: float(out_sample[m][0, 0]) for m in METRICS},
+        })
+    return folds
+
+
+def cache_key(ticker, close, fast_windows, slow_windows, cost):
+    data_hash = hashlib.sha256(np.ascontiguousarray(close, dtype='float64').tobytes()).hexdigest()[:16]
+    params = json.dumps([list(map(int, fast_windows)), list(map(int, slow_windows)), cost])
+    return f"{ticker}_{data_hash}_{hashlib.sha256(params.encode()).hexdigest()[:16]}"
+
+
+def cached_grid_backtest(ticker, close, fast_windows, slow_windows, cost=0.0):
+    path = os.path.join(CACHE_DIR, f"{cache_key(ticker, close, fast_windows, slow_windows, cost)}.npz")
+    try:
+        with np.load(path) as cached:
+            return {metric: cached[metric] for metric in METRICS}
+    except (OSError, ValueError, KeyError):
+        pass
+    results = grid_backtest(close, fast_windows, slow_windows, cost=cost)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp, **results)
+    os.replace(tmp, path)
+    return results
+
+
+def _sweep_one(args):
+    ticker, close, fast_windows, slow_windows, cost = args
+    return ticker, cached_grid_backtest(ticker, close, fast_windows, slow_windows, cost)
+
+
+def sweep(closes, fast_windows, slow_windows, cost=0.0, workers=None):
+    # closes maps ticker -> close array; one process per core by default
+    jobs = [(ticker, np.asarray(close, dtype='float64'), fast_windows, slow_windows, cost) for ticker, close in closes.items()]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return dict(executor.map(_sweep_one, jobs, chunksize=max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))))
+
+
+def load_closes(tickers, period="5y"):
+    closes = {}
+    for ticker in tickers:
+        hist, _ = store.read_partition(ticker)
+        if hist is not None and not hist.empty:
+            closes[ticker] = store.slice_period(hist, period)['Close'].to_numpy(dtype='float64')
+    return closes
+
+
+def parse_range(text):
+    start, stop, step = (int(x) for x in text.split(":"))
+    return np.arange(start, stop, step)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep SMA crossover windows over tickers in the local store.")
+    parser.add_argument("tickers", nargs="+", help="Yahoo tickers, e.g. TCS.NS RELIANCE.NS")
+    parser.add_argument("--period", default="5y")
+    parser.add_argument("--fast", default="5:55:1", help="start:stop:step")
+    parser.add_argument("--slow", default="50:300:5", help="start:stop:step")
+    parser.add_argument("--cost", type=float, default=0.0, help="Cost per unit of turnover")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    fast_windows, slow_windows = parse_range(args.fast), parse_range(args.slow)
+    closes = load_closes(args.tickers, args.period)
+    for ticker in args.tickers:
+        if ticker not in closes:
+            print(f"{ticker}: no stored history, open it in the app or run the screener first")
+    for ticker, results in sweep(closes, fast_windows, slow_windows, args.cost, args.workers).items():
+        fast, slow = best_params(results, fast_windows, slow_windows)
+        i, j = list(fast_windows).index(fast), list(slow_windows).index(slow)
+        summary = ", ".join(f"{m}={results[m][i, j]:.3f}" for m in METRICS)
+        print(f"{ticker}: best SMA{fast}/SMA{slow} {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from signals import crossover_signals
+
+
+def legacy_determine_signals(hist):
+    # Row-by-row implementation that app.py used before signals.py
+    buy_signals = []
+    sell_signals = []
+    accuracy_count = 0
+    if len(hist) < 50 or 'Close' not in hist.columns:
+        return buy_signals, sell_signals, 0.0
+    hist['SMA50'] = hist['Close'].rolling(window=50, min_periods=1).mean()
+    hist['SMA200'] = hist['Close'].rolling(window=200, min_periods=1).mean()
+    for i in range(1, len(hist)):
+        if hist['SMA50'].iloc[i-1] < hist['SMA200'].iloc[i-1] and hist['SMA50'].iloc[i] > hist['SMA200'].iloc[i]:
+            buy_signals.append(hist.index[i])
+        elif hist['SMA50'].iloc[i-1] > hist['SMA200'].iloc[i-1] and hist['SMA50'].iloc[i] < hist['SMA200'].iloc[i]:
+            sell_signals.append(hist.index[i])
+        if (i > 1 and (hist['Close'].iloc[i] > hist['Close'].iloc[i-1]) and hist.index[i-1] in buy_signals) or \
+           (i > 1 and (hist['Close'].iloc[i] < hist['Close'].iloc[i-1]) and hist.index[i-1] in sell_signals):
+            accuracy_count += 1
+    accuracy_percentage = accuracy_count / (len(buy_signals) + len(sell_signals)) * 100 if (len(buy_signals) + len(sell_signals)) > 0 else 0.0
+    return buy_signals, sell_signals, accuracy_percentage
+
+
+def synthetic_close(n, seed=42):
+    rng = np.random.default_rng(seed)
+    return 1000 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+
+
+def best_of(fn, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    sizes = [1_000, 10_000, 100_000]
+    legacy_limit = 10_000
+    print(f"{'bars':>10} {'vectorized (ms)':>16} {'ns/bar':>8} {'legacy (ms)':>12}")
+    for n in sizes:
+        close = synthetic_close(n)
+        elapsed = best_of(lambda: crossover_signals(close))
+        legacy = ""
+        if n <= legacy_limit:
+            hist = pd.DataFrame({'Close': close}, index=pd.date_range("2000-01-01", periods=n, freq="D"))
+            result = crossover_signals(close)
+            buy, sell, accuracy = legacy_determine_signals(hist.copy())
+            assert list(hist.index[result.buy]) == buy and list(hist.index[result.sell]) == sell
+            assert abs(result.accuracy - accuracy) < 1e-9
+            legacy = f"{best_of(lambda: legacy_determine_signals(hist.copy()), repeat=1) * 1000:12.1f}"
+        print(f"{n:>10} {elapsed * 1000:16.3f} {elapsed / n * 1e9:8.1f} {legacy:>12}")
+
+
+if __name__ == "__main__":
+    main()
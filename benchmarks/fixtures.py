@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+
+# Deterministic synthetic OHLCV: a geometric random walk for the close, with
+# open/high/low and volume derived from the same seeded generator.
+
+
+def synthetic_ohlcv(n, seed=42, start="2000-01-03", freq="B", tz="Asia/Kolkata"):
+    rng = np.random.default_rng(seed)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = np.concatenate([[close[0]], close[:-1]]) * (1 + rng.normal(0, 0.002, n))
+    spread = np.abs(rng.normal(0, 0.005, n)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.integers(10_000, 5_000_000, n, dtype='int64')
+    index = pd.date_range(start, periods=n, freq=freq, tz=tz, name="Date")
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume}, index=index)
+
+
+def synthetic_universe(tickers, n, seed=42):
+    # One frame per ticker, each with its own seed so the series differ
+    return {f"SYN{i:04d}.NS": synthetic_ohlcv(n, seed=seed + i) for i in range(tickers)}
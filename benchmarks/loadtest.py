@@ -0,0 +1,163 @@
+import argparse
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import stubs
+
+# Load test: N simulated sessions drive app.py headlessly (Streamlit's
+# AppTest) through symbol changes, indicator toggles and Update Chart, with
+# Yahoo and Groq replaced by the local stubs. Reports throughput, latency
+# percentiles per user action and per internal stage, and memory per session.
+APP_PATH = os.path.join(ROOT, "app.py")
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            self.samples[name].append(seconds)
+
+    def time(self, name, fn):
+        start = time.perf_counter()
+        fn()
+        self.add(name, time.perf_counter() - start)
+
+    def summary(self):
+        with self._lock:
+            samples = {name: np.array(values) for name, values in self.samples.items()}
+        return {name: {
+            "count": len(values),
+            "p50_ms": float(np.percentile(values, 50) * 1000),
+            "p95_ms": float(np.percentile(values, 95) * 1000),
+            "p99_ms": float(np.percentile(values, 99) * 1000),
+            "max_ms": float(values.max() * 1000),
+        } for name, values in sorted(samples.items())}
+
+
+def widget(widgets, label):
+    for item in widgets:
+        if item.label == label:
+            return item
+    raise LookupError(f"No widget labelled '{label}'")
+
+
+def run_session(number, symbols, iterations, actions, fundamental, timeout):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    errors = 0
+
+    def rerun(action):
+        nonlocal errors
+        actions.time(action, at.run)
+        errors += len(at.exception)
+
+    rerun("first_load")
+    if fundamental:
+        widget(at.checkbox, "Show Fundamental Analysis").check()
+    for i in range(iterations):
+        widget(at.text_input, "Enter Stock Symbol").input(symbols[(number + i) % len(symbols)])
+        rerun("symbol_change")
+        chooser = widget(at.multiselect, "Select Indicators")
+        if "Relative Strength Index (RSI)" in chooser.value:
+            chooser.unselect("Relative Strength Index (RSI)")
+        else:
+            chooser.select("Relative Strength Index (RSI)")
+        rerun("indicator_toggle")
+        at.button(key="update_chart").click()
+        rerun("update_chart")
+    return errors
+
+
+def max_rss_bytes():
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive simulated MarketMind sessions against local Yahoo and Groq stubs.")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=5, help="Symbol change / indicator toggle / Update Chart rounds per session")
+    parser.add_argument("--symbols", default="", help="Comma separated symbols; defaults to the NSE symbol list")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean Yahoo stub latency in seconds")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Mean Groq stub latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stub requests that fail with a 503")
+    parser.add_argument("--yahoo-rate", type=float, default=None, help="Override the Yahoo token bucket rate (requests per second)")
+    parser.add_argument("--fundamental", action="store_true", help="Also run the fundamental analysis panel")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-rerun timeout in seconds")
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    args = parser.parse_args()
+
+    stub, base_url = stubs.start(latency=args.latency, llm_latency=args.llm_latency, error_rate=args.error_rate)
+    data_dir = tempfile.mkdtemp(prefix="marketmind-load-")
+    os.environ.update({
+        "MARKETMIND_DATA_DIR": data_dir,
+        "MARKETMIND_HISTORY_SOURCE": "chart",
+        "MARKETMIND_YAHOO_CHART_URL": f"{base_url}/v8/finance/chart",
+        "GROQ_BASE_URL": base_url,
+        "GROQ_API_KEY": "stub",
+    })
+    if args.yahoo_rate is not None:
+        os.environ["MARKETMIND_YAHOO_RATE"] = str(args.yahoo_rate)
+
+    # Imported only now so the app modules pick up the stub settings
+    import metrics
+    from symbols import get_symbol_master
+
+    symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()] or get_symbol_master().symbols("NSE")
+    actions, stages = Recorder(), Recorder()
+    metrics.add_hook(lambda name, seconds, labels: stages.add(name, seconds))
+
+    baseline_rss = max_rss_bytes()
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+            futures = [pool.submit(run_session, n, symbols, args.iterations, actions, args.fundamental, args.timeout)
+                       for n in range(args.sessions)]
+            errors = sum(future.result() for future in futures)
+    finally:
+        stub.shutdown()
+        shutil.rmtree(data_dir, ignore_errors=True)
+    elapsed = time.perf_counter() - start
+    reruns = sum(len(values) for values in actions.samples.values())
+
+    report = {
+        "sessions": args.sessions,
+        "reruns": reruns,
+        "errors": errors,
+        "seconds": elapsed,
+        "reruns_per_second": reruns / elapsed,
+        "memory_per_session_bytes": (max_rss_bytes() - baseline_rss) / args.sessions,
+        "actions": actions.summary(),
+        "stages": stages.summary(),
+    }
+    print(f"{args.sessions} sessions, {reruns} reruns in {elapsed:.1f}s ({report['reruns_per_second']:.1f} reruns/s), {errors} exceptions")
+    print(f"Peak memory growth per session: {report['memory_per_session_bytes'] / 1e6:.1f} MB")
+    for title, rows in (("Action", report["actions"]), ("Stage", report["stages"])):
+        print(f"\n{title:<18} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        for name, row in rows.items():
+            print(f"{name:<18} {row['count']:>6} {row['p50_ms']:9.1f} {row['p95_ms']:9.1f} {row['p99_ms']:9.1f} {row['max_ms']:9.1f}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cold start report: runs app.py once in a fresh interpreter under
+# `python -X importtime` (Streamlit's bare mode, no server) and breaks the
+# startup time down by top-level package. Panels named with --panels are
+# loaded afterwards, so their cost shows up separately from the base app.
+PROBE = """
+import json, os, runpy, sys, time
+sys.path.insert(0, {root!r})
+os.chdir({root!r})
+start = time.perf_counter()
+runpy.run_path("app.py", run_name="__main__")
+app_seconds = time.perf_counter() - start
+import panels
+for key in {panels!r}:
+    panels.load(key)
+print("STARTUP " + json.dumps({{"app_seconds": app_seconds, "panels": panels.import_times()}}))
+"""
+
+
+def parse_importtime(stderr):
+    # "import time: self [us] | cumulative | imported package" lines, one per module
+    by_package = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        by_package[name.strip().split(".")[0]] += int(self_us) / 1e6
+    return dict(by_package)
+
+
+def measure(panels=()):
+    env = dict(os.environ, STREAMLIT_LOG_LEVEL="error")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", PROBE.format(root=ROOT, panels=list(panels))],
+                            capture_output=True, text=True, env=env, cwd=ROOT)
+    summary = next((line[len("STARTUP "):] for line in result.stdout.splitlines() if line.startswith("STARTUP ")), None)
+    if summary is None:
+        raise RuntimeError(f"App startup failed:\n{result.stderr[-2000:]}")
+    report = json.loads(summary)
+    report["imports"] = parse_importtime(result.stderr)
+    report["import_seconds"] = sum(report["imports"].values())
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Break down the app's cold start time by imported package.")
+    parser.add_argument("--panels", default="", help="Comma separated panels to load after startup, e.g. charts,sentiment,fundamental")
+    parser.add_argument("--top", type=int, default=15, help="Number of packages to list")
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    args = parser.parse_args()
+
+    report = measure([p.strip() for p in args.panels.split(",") if p.strip()])
+    print(f"App script: {report['app_seconds'] * 1000:.0f} ms, of which imports {report['import_seconds'] * 1000:.0f} ms")
+    print(f"\n{'Package':<28} {'ms':>9}")
+    for name, seconds in sorted(report["imports"].items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<28} {seconds * 1000:9.1f}")
+    if report["panels"]:
+        print(f"\n{'Panel':<28} {'ms':>9}")
+        for key, seconds in report["panels"].items():
+            print(f"{key:<28} {seconds * 1000:9.1f}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
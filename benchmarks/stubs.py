@@ -0,0 +1,171 @@
+import json
+import random
+import threading
+import time
+import zlib
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from fixtures import synthetic_ohlcv
+
+# Local stand-ins for Yahoo's v8 chart endpoint and Groq's chat completion
+# API, with configurable latency and error rate. Tickers starting with
+# "BAD" are unknown; every other ticker has a deterministic synthetic
+# history, so repeated and overlapping requests agree with each other.
+RANGES = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+TZ = "Asia/Kolkata"
+
+
+def ticker_seed(ticker):
+    return zlib.crc32(ticker.upper().encode())
+
+
+@lru_cache(maxsize=256)
+def daily_bars(ticker, today):
+    calendar = pd.bdate_range("2000-01-03", today, tz=TZ)
+    return synthetic_ohlcv(len(calendar), seed=ticker_seed(ticker), start=calendar[0], freq="B", tz=TZ)
+
+
+def intraday_bars(ticker, minutes, now):
+    # Today's session at the requested bar size, up to the current bar
+    session = pd.Timestamp(now.date(), tz=TZ) + pd.Timedelta(hours=9, minutes=15)
+    bars = synthetic_ohlcv(375 // minutes, seed=ticker_seed(ticker), start=session, freq=f"{minutes}min", tz=TZ)
+    return bars[bars.index <= now]
+
+
+def chart_payload(ticker, query):
+    now = pd.Timestamp.now(tz=TZ)
+    interval = query.get("interval", "1d")
+    if interval == "1d":
+        bars = daily_bars(ticker, now.date().isoformat())
+    else:
+        bars = intraday_bars(ticker, int(interval.rstrip("m")), now)
+    if "period1" in query:
+        start = pd.Timestamp(int(query["period1"]), unit='s', tz='UTC')
+        end = pd.Timestamp(int(query.get("period2", time.time())), unit='s', tz='UTC')
+        bars = bars[(bars.index >= start) & (bars.index < end)]
+    elif query.get("range", "1mo") != "max":
+        start = now.normalize() - RANGES.get(query.get("range", "1mo"), RANGES["1mo"])
+        bars = bars[bars.index >= start]
+    return {"chart": {"result": [{
+        "meta": {"symbol": ticker, "currency": "INR", "exchangeTimezoneName": TZ, "dataGranularity": interval},
+        "timestamp": (bars.index.as_unit('s').asi8).tolist(),
+        "indicators": {
+            "quote": [{col.lower(): bars[col].round(4).tolist() for col in ['Open', 'High', 'Low', 'Close', 'Volume']}],
+            "adjclose": [{"adjclose": bars['Close'].round(4).tolist()}],
+        },
+    }], "error": None}}
+
+
+def completion_payload(body):
+    prompt = " ".join(m.get("content", "") for m in body.get("messages", []))
+    symbol = prompt.split("'")[1] if prompt.count("'") >= 2 else "the stock"
+    if "sentiment" in prompt.lower():
+        content = (
+            "Overall Sentiment: Positive\nHeadlines:\n"
+            f"1. {symbol} beats quarterly estimates - Positive\n"
+            f"2. {symbol} expands capacity - Positive\n"
+            f"3. Analysts split on {symbol} valuation - Neutral"
+        )
+    else:
+        content = (
+            f"- **Revenue Growth**: {symbol} has grown revenue steadily.\n"
+            f"- **Profit Margins**: Margins for {symbol} are stable.\n"
+            f"- **Risks**: {symbol} faces sector competition."
+        )
+    return {
+        "id": f"chatcmpl-stub-{random.getrandbits(32):08x}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": len(content.split()),
+                  "total_tokens": len(prompt.split()) + len(content.split())},
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def delay(self, latency):
+        # Uniform jitter around the configured mean latency
+        if latency:
+            time.sleep(latency * (0.5 + random.random()))
+
+    def failed(self):
+        if random.random() < self.server.error_rate:
+            self.send_json(503, {"error": {"message": "stub injected failure"}})
+            return True
+        return False
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        prefix = "/v8/finance/chart/"
+        if not url.path.startswith(prefix):
+            return self.send_json(404, {"error": "not found"})
+        self.delay(self.server.latency)
+        if self.failed():
+            return
+        ticker = url.path[len(prefix):]
+        if ticker.upper().startswith("BAD"):
+            return self.send_json(404, {"chart": {"result": None, "error": {"code": "Not Found", "description": "No data found, symbol may be delisted"}}})
+        self.send_json(200, chart_payload(ticker, {k: v[-1] for k, v in parse_qs(url.query).items()}))
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        if urlparse(self.path).path != "/openai/v1/chat/completions":
+            return self.send_json(404, {"error": "not found"})
+        self.delay(self.server.llm_latency)
+        if self.failed():
+            return
+        self.send_json(200, completion_payload(body))
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start(host="127.0.0.1", port=0, latency=0.0, llm_latency=0.0, error_rate=0.0):
+    # Returns the server and its base URL; port 0 picks a free port. Latencies are in seconds.
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    server.latency, server.llm_latency, server.error_rate = latency, llm_latency, error_rate
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Serve the Yahoo chart and Groq stand-ins.")
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean chart latency in seconds")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Mean completion latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    server, base = start(port=args.port, latency=args.latency, llm_latency=args.llm_latency, error_rate=args.error_rate)
+    print(f"MARKETMIND_YAHOO_CHART_URL={base}/v8/finance/chart MARKETMIND_HISTORY_SOURCE=chart GROQ_BASE_URL={base}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
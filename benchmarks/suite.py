@@ -0,0 +1,199 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixtures import synthetic_ohlcv, synthetic_universe
+
+# Offline benchmark suite: each case times one hot path on synthetic data at
+# several sizes and records its peak traced memory. Results are JSON files
+# that `compare` checks against a baseline.
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+QUICK_SIZES = [1_000, 10_000]
+ALL_INDICATORS = ["Moving Average (MA)", "Relative Strength Index (RSI)", "Bollinger Bands", "MACD"]
+
+CASES = {}
+
+
+def case(name, sizes=None, quick_sizes=None):
+    # Registers setup(n) -> callable; the callable is what gets timed
+    def register(setup):
+        CASES[name] = (setup, sizes or SIZES, quick_sizes or QUICK_SIZES)
+        return setup
+    return register
+
+
+@case("indicators")
+def bench_indicators(n):
+    from indicators import add_indicators
+    hist = synthetic_ohlcv(n)
+    return lambda: add_indicators(hist.copy(), ALL_INDICATORS)
+
+
+@case("signals")
+def bench_signals(n):
+    from signals import crossover_signals
+    close = synthetic_ohlcv(n)['Close'].to_numpy()
+    return lambda: crossover_signals(close)
+
+
+@case("prediction")
+def bench_prediction(n):
+    from prediction import process_data
+    hist = synthetic_ohlcv(n)
+    return lambda: process_data(hist)
+
+
+@case("chart")
+def bench_chart(n):
+    from charts import price_figure, volume_figure
+    from indicators import add_indicators
+    hist = add_indicators(synthetic_ohlcv(n), ALL_INDICATORS)
+    return lambda: (price_figure(hist, "SYN", ALL_INDICATORS), volume_figure(hist, "SYN"))
+
+
+@case("validate_ticker", sizes=[100], quick_sizes=[20])
+def bench_validate_ticker(n):
+    # n uncached lookups against the local chart stub; fresh symbols every run
+    from historical import validate_ticker
+    counter = itertools.count()
+
+    def run():
+        for _ in range(n):
+            validate_ticker(f"SYN{next(counter):06d}", "NSE")
+    return run
+
+
+@case("screener", sizes=[10, 100, 500], quick_sizes=[10, 100])
+def bench_screener(n):
+    # n is the number of tickers, each with 1000 bars
+    from screener import screen_frames
+    frames = synthetic_universe(n, 1_000)
+    return lambda: screen_frames(frames)
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_suite(names, quick=False):
+    results = {}
+    for name in names:
+        setup, sizes, quick_sizes = CASES[name]
+        for n in (quick_sizes if quick else sizes):
+            fn = setup(n)
+            fn()  # warm imports and caches
+            seconds = best_of(fn, repeat=5 if n <= 100_000 else 2)
+            peak = peak_memory(fn)
+            results[f"{name}/{n}"] = {"case": name, "n": n, "seconds": seconds, "peak_bytes": peak}
+            print(f"{name:>16} {n:>10} {seconds * 1000:12.3f} ms {peak / 1e6:10.2f} MB", flush=True)
+    return results
+
+
+def environment():
+    return {
+        "created": datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+def compare(baseline, current, threshold):
+    # Returns the rows that got slower or used more memory than the threshold allows
+    regressions = []
+    print(f"{'benchmark':>28} {'baseline ms':>12} {'current ms':>12} {'time':>7} {'memory':>7}")
+    for key, base in baseline["results"].items():
+        cur = current["results"].get(key)
+        if cur is None:
+            continue
+        time_ratio = cur["seconds"] / base["seconds"] if base["seconds"] else 1.0
+        memory_ratio = cur["peak_bytes"] / base["peak_bytes"] if base["peak_bytes"] else 1.0
+        flag = ""
+        if time_ratio > 1 + threshold or memory_ratio > 1 + threshold:
+            regressions.append(key)
+            flag = "  REGRESSION"
+        print(f"{key:>28} {base['seconds'] * 1000:12.3f} {cur['seconds'] * 1000:12.3f} {time_ratio:6.2f}x {memory_ratio:6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline MarketMind benchmarks or compare two result files.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="Run the suite and write a JSON result file")
+    run.add_argument("--cases", default=",".join(CASES), help="Comma separated cases to run")
+    run.add_argument("--quick", action="store_true", help="Only the small sizes")
+    run.add_argument("--output", default=os.path.join(BASELINE_DIR, "latest.json"))
+    cmp = sub.add_parser("compare", help="Compare a result file against a baseline")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current", nargs="?", default=os.path.join(BASELINE_DIR, "latest.json"))
+    cmp.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown or memory growth, as a fraction")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print("No regressions.")
+        return
+
+    names = [name.strip() for name in args.cases.split(",") if name.strip()]
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error(f"Unknown cases: {', '.join(unknown)}")
+    # Everything stays offline: a throwaway store, and ticker validation goes to the local stub
+    import stubs
+    stub, base_url = stubs.start()
+    data_dir = tempfile.mkdtemp(prefix="marketmind-bench-")
+    os.environ["MARKETMIND_DATA_DIR"] = data_dir
+    os.environ["MARKETMIND_YAHOO_CHART_URL"] = f"{base_url}/v8/finance/chart"
+    os.environ["MARKETMIND_YAHOO_RATE"] = "1000000"
+    os.environ["MARKETMIND_YAHOO_BURST"] = "1000000"
+    try:
+        results = run_suite(names, quick=args.quick)
+    finally:
+        stub.shutdown()
+        shutil.rmtree(data_dir, ignore_errors=True)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+import metrics
+
+# Process-wide frame cache shared by every Streamlit session. Entries are
+# stored once with read-only arrays and handed out as shallow views, and
+# concurrent misses for one key wait on a single load.
+CACHE_BUDGET_MB = float(os.getenv("MARKETMIND_CACHE_MB", "512"))
+
+
+def as_of_bar():
+    return datetime.now(ZoneInfo("Asia/Kolkata")).date().isoformat()
+
+
+def freeze(frame):
+    # PriceFrames are read-only already; DataFrames get read-only copies of their columns
+    if not isinstance(frame, pd.DataFrame):
+        return frame
+    arrays = {}
+    for col in frame.columns:
+        arr = np.array(frame[col].to_numpy(), copy=True)
+        arr.flags.writeable = False
+        arrays[col] = arr
+    return pd.DataFrame(arrays, index=frame.index, copy=False)
+
+
+def frame_bytes(frame):
+    if not isinstance(frame, pd.DataFrame):
+        return int(frame.nbytes)
+    return int(frame.memory_usage(index=True, deep=False).sum())
+
+
+def share(frame):
+    # Each caller gets its own shallow DataFrame so column edits stay local
+    return frame.copy(deep=False) if isinstance(frame, pd.DataFrame) else frame
+
+
+class SharedCache:
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get_or_load(self, key, loader):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return share(entry[0])
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            frame = future.result()
+            return share(frame) if frame is not None else frame
+
+        try:
+            frame = loader()
+            if frame is not None and not frame.empty:
+                frame = freeze(frame)
+                self._insert(key, frame)
+            future.set_result(frame)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return share(frame) if frame is not None else frame
+
+    def _insert(self, key, frame):
+        size = frame_bytes(frame)
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (frame, size)
+            self.bytes += size
+            self._evict()
+        # PriceFrames grow as sessions add indicator columns and resampled bars; re-size the entry when they do
+        if not isinstance(frame, pd.DataFrame):
+            frame.set_listener(lambda: self._resize(key, frame))
+
+    def _resize(self, key, frame):
+        size = frame_bytes(frame)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] is not frame:
+                return
+            self._entries[key] = (frame, size)
+            self.bytes += size - entry[1]
+            self._evict()
+
+    def _evict(self):
+        # Evict least recently used entries, always keeping the newest one; called with the lock held
+        while self.bytes > self.budget_bytes and len(self._entries) > 1:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+
+    def invalidate(self, predicate):
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                self.bytes -= self._entries.pop(key)[1]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+            }
+
+
+history_cache = SharedCache(int(CACHE_BUDGET_MB * 1024 * 1024))
+metrics.register_collector("history_cache", history_cache.stats)
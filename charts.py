@@ -0,0 +1,139 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import plotly.graph_objs as go
+
+import metrics
+
+# Chart building with the payload capped to what the chart can show:
+# candles and volume are aggregated into buckets, overlay lines keep each
+# bucket's min and max, and overlays are drawn with WebGL.
+MAX_CANDLES = int(os.getenv("MARKETMIND_MAX_CANDLES", "600"))
+MAX_LINE_POINTS = int(os.getenv("MARKETMIND_MAX_LINE_POINTS", "2000"))
+FIGURE_CACHE_SIZE = int(os.getenv("MARKETMIND_FIGURE_CACHE_SIZE", "64"))
+
+_figures = OrderedDict()
+_figures_lock = threading.Lock()
+
+
+def bucket_starts(n, buckets):
+    if n <= buckets:
+        return np.arange(n)
+    return np.unique(np.linspace(0, n, buckets, endpoint=False).astype(np.intp))
+
+
+def aggregate_ohlcv(hist, max_bars=MAX_CANDLES):
+    # One candle per bucket: first open, highest high, lowest low, last close, summed volume
+    starts = bucket_starts(len(hist), max_bars)
+    if len(starts) == len(hist):
+        return hist.index, {col: hist[col].to_numpy() for col in ['Open', 'High', 'Low', 'Close', 'Volume'] if col in hist.columns}
+    ends = np.append(starts[1:], len(hist)) - 1
+    bars = {
+        'Open': hist['Open'].to_numpy()[starts],
+        'High': np.maximum.reduceat(hist['High'].to_numpy(), starts),
+        'Low': np.minimum.reduceat(hist['Low'].to_numpy(), starts),
+        'Close': hist['Close'].to_numpy()[ends],
+    }
+    if 'Volume' in hist.columns:
+        bars['Volume'] = np.add.reduceat(hist['Volume'].to_numpy(), starts, dtype='int64')
+    return hist.index[starts], bars
+
+
+def minmax_downsample(x, y, max_points=MAX_LINE_POINTS):
+    # Keep the lowest and highest point of every bucket, in time order, so peaks survive
+    y = np.asarray(y, dtype='float64')
+    valid = np.flatnonzero(~np.isnan(y))
+    if len(valid) <= max_points:
+        return x[valid], y[valid]
+    buckets = max_points // 2
+    segment = (valid * buckets) // len(y)
+    by_value = np.lexsort((y[valid], segment))
+    order, sorted_segments = valid[by_value], segment[by_value]
+    first = np.flatnonzero(np.r_[True, sorted_segments[1:] != sorted_segments[:-1]])
+    last = np.r_[first[1:] - 1, len(order) - 1]
+    keep = np.unique(np.concatenate([order[first], order[last]]))
+    return x[keep], y[keep]
+
+
+def price_figure(hist, symbol, indicators):
+    x, bars = aggregate_ohlcv(hist)
+    fig = go.Figure(data=[go.Candlestick(
+        x=x,
+        open=bars['Open'],
+        high=bars['High'],
+        low=bars['Low'],
+        close=bars['Close'],
+        name='Candlestick',
+        increasing_line_color='#22C55E',
+        decreasing_line_color='#EF4444'
+    )])
+
+    def add_line(column, name, line, yaxis=None):
+        line_x, line_y = minmax_downsample(hist.index, hist[column].to_numpy())
+        fig.add_trace(go.Scattergl(x=line_x, y=line_y, mode='lines', name=name, line=line, yaxis=yaxis))
+
+    if "Moving Average (MA)" in indicators and 'MA' in hist.columns:
+        add_line('MA', 'MA', dict(color='#10B981'))
+    if "Relative Strength Index (RSI)" in indicators and 'RSI' in hist.columns:
+        add_line('RSI', 'RSI', dict(color='#F59E0B'), yaxis="y2")
+    if "Bollinger Bands" in indicators and all(x in hist.columns for x in ['BB_Upper', 'BB_Lower']):
+        add_line('BB_Upper', 'BB Upper', dict(color='#3B82F6', dash='dash'))
+        add_line('BB_Lower', 'BB Lower', dict(color='#3B82F6', dash='dash'))
+    if "MACD" in indicators and 'MACD' in hist.columns:
+        add_line('MACD', 'MACD', dict(color='#EC4899'), yaxis="y3")
+
+    fig.update_layout(
+        title=f"{symbol} Price Chart",
+        xaxis_title="Date",
+        yaxis_title="Price (INR)",
+        template="plotly_dark",
+        xaxis_rangeslider_visible=True,
+        yaxis=dict(gridcolor='#374151'),
+        plot_bgcolor='#181825',
+        paper_bgcolor='#181825',
+        font=dict(color='#D4D4D8'),
+        showlegend=True,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        yaxis2=dict(title="RSI", overlaying="y", side="right", showgrid=False, range=[0, 100]),
+        yaxis3=dict(title="MACD", overlaying="y", side="right", showgrid=False, anchor="free", position=0.95)
+    )
+    return fig
+
+
+def volume_figure(hist, symbol):
+    x, bars = aggregate_ohlcv(hist)
+    fig = go.Figure(data=[go.Bar(
+        x=x,
+        y=bars['Volume'],
+        name='Volume',
+        marker_color='#3B82F6'
+    )])
+    fig.update_layout(
+        title=f"{symbol} Trading Volume",
+        xaxis_title="Date",
+        yaxis_title="Volume",
+        template="plotly_dark",
+        plot_bgcolor='#181825',
+        paper_bgcolor='#181825',
+        font=dict(color='#D4D4D8'),
+        yaxis=dict(gridcolor='#374151')
+    )
+    return fig
+
+
+def cached_figure(key, build):
+    # Built figures are shared across reruns and sessions under their chart key
+    with _figures_lock:
+        if key in _figures:
+            _figures.move_to_end(key)
+            metrics.inc("figure_cache_hits")
+            return _figures[key]
+    with metrics.span("figure"):
+        fig = build()
+    with _figures_lock:
+        _figures[key] = fig
+        while len(_figures) > FIGURE_CACHE_SIZE:
+            _figures.popitem(last=False)
+    return fig
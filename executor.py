@@ -0,0 +1,64 @@
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+# One thread pool shared by every session, so page latency is the slowest
+# analysis rather than the sum of all of them.
+MAX_WORKERS = int(os.getenv("MARKETMIND_WORKERS", "16"))
+HISTORY_TIMEOUT = float(os.getenv("MARKETMIND_HISTORY_TIMEOUT", "30"))
+LLM_TIMEOUT = float(os.getenv("MARKETMIND_LLM_TIMEOUT", "20"))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="marketmind")
+
+
+def submit(fn, *args, **kwargs):
+    # Carry the caller's Streamlit context so tasks can use st.session_state,
+    # and its context variables so spans keep the rerun's trace id
+    ctx = get_script_run_ctx()
+    variables = contextvars.copy_context()
+
+    def run():
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        return variables.run(fn, *args, **kwargs)
+
+    return _executor.submit(run)
+
+
+class AnalysisBatch:
+    def __init__(self, key):
+        self.key = key
+        self.futures = {}
+        self.deadlines = {}
+        self.cancelled = False
+
+    def start(self, name, fn, *args, timeout=None, **kwargs):
+        self.futures[name] = submit(fn, *args, **kwargs)
+        self.deadlines[name] = time.monotonic() + timeout if timeout else None
+
+    def cancel(self):
+        self.cancelled = True
+        for future in self.futures.values():
+            future.cancel()
+
+    def as_completed(self, poll_interval=0.25):
+        # Yields (name, result, error) in completion order; tasks past their deadline yield a TimeoutError
+        pending = dict(self.futures)
+        names = {future: name for name, future in pending.items()}
+        while pending and not self.cancelled:
+            done, _ = wait(pending.values(), timeout=poll_interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = names[future]
+                del pending[name]
+                if future.cancelled():
+                    continue
+                error = future.exception()
+                yield name, (None if error else future.result()), error
+            now = time.monotonic()
+            for name in [n for n in pending if self.deadlines[n] is not None and self.deadlines[n] < now]:
+                pending.pop(name).cancel()
+                yield name, None, TimeoutError(f"{name} did not finish in time")
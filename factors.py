@@ -0,0 +1,311 @@
+import argparse
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import store
+from cache import as_of_bar
+from indicators import INDICATORS, IndicatorEngine
+from metrics import span
+from screener import BATCH_SIZE, MAX_WORKERS, download_batch, ticker_symbol
+from signals import crossover_signals, rolling_mean
+from symbols import get_symbol_master
+
+# End-of-day factor table: one row per symbol of an exchange, one column per
+# indicator or signal value as of the last close, built by a batch job and
+# saved as .npy columns. Each numeric factor has a sorted index (argsort,
+# NaN last) for range filters and top-N rankings; each categorical factor
+# has one bitmap per label. Queries only read the table, never the network.
+FACTOR_DIR = os.path.join(store.STORE_DIR, "factors")
+BUILD_PERIOD = os.getenv("MARKETMIND_FACTOR_PERIOD", "2y")
+KEEP_VERSIONS = 2
+NUMERIC_FACTORS = [
+    'close', 'change_pct', 'volume', 'ma20', 'rsi14', 'bb_upper', 'bb_lower', 'bb_pct', 'macd',
+    'sma50', 'sma200', 'dist_sma50_pct', 'dist_sma200_pct', 'return_1m_pct', 'return_3m_pct',
+    'return_1y_pct', 'high_52w_pct', 'signal_age',
+]
+CATEGORIES = {
+    'signal': ["None", "Buy", "Sell"],
+    'rsi_zone': ["Neutral", "Oversold", "Overbought"],
+}
+FACTORS = NUMERIC_FACTORS + list(CATEGORIES)
+OPERATORS = {
+    "<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal,
+    "==": np.equal, "=": np.equal, "!=": np.not_equal,
+}
+FILTER = re.compile(r"^\s*([a-z0-9_]+)\s*(<=|>=|==|!=|<|>|=)\s*([^\s]+)\s*$", re.IGNORECASE)
+
+
+def ticker_factors(hist):
+    # Factor values for one ticker as of its last bar
+    close = hist['Close'].to_numpy(dtype='float64')
+    n = len(close)
+    last = close[-1]
+    columns = IndicatorEngine(list(INDICATORS)).fit(close)
+    sma50 = rolling_mean(close, 50, min_periods=50)[-1]
+    sma200 = rolling_mean(close, 200, min_periods=200)[-1]
+    band = columns['BB_Upper'][-1] - columns['BB_Lower'][-1]
+
+    def change(bars):
+        return (last / close[-1 - bars] - 1) * 100 if n > bars else np.nan
+
+    signals = crossover_signals(close)
+    last_buy = signals.buy[-1] if len(signals.buy) else -1
+    last_sell = signals.sell[-1] if len(signals.sell) else -1
+    signal = "None" if max(last_buy, last_sell) < 0 else "Buy" if last_buy > last_sell else "Sell"
+    rsi = columns['RSI'][-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {
+            'close': last,
+            'change_pct': change(1),
+            'volume': float(hist['Volume'].iloc[-1]),
+            'ma20': columns['MA'][-1],
+            'rsi14': rsi,
+            'bb_upper': columns['BB_Upper'][-1],
+            'bb_lower': columns['BB_Lower'][-1],
+            'bb_pct': (last - columns['BB_Lower'][-1]) / band * 100 if band > 0 else np.nan,
+            'macd': columns['MACD'][-1],
+            'sma50': sma50,
+            'sma200': sma200,
+            'dist_sma50_pct': (last / sma50 - 1) * 100,
+            'dist_sma200_pct': (last / sma200 - 1) * 100,
+            'return_1m_pct': change(21),
+            'return_3m_pct': change(63),
+            'return_1y_pct': change(252),
+            'high_52w_pct': (last / close[-252:].max() - 1) * 100,
+            'signal_age': float(n - 1 - max(last_buy, last_sell)) if signal != "None" else np.nan,
+            'signal': signal,
+            'rsi_zone': "Oversold" if rsi < 30 else "Overbought" if rsi > 70 else "Neutral",
+        }
+
+
+def build_table(exchange="NSE", symbols=None, period=BUILD_PERIOD, batch_size=BATCH_SIZE, max_workers=MAX_WORKERS):
+    # The batch job: fetch (or read from the store) every symbol's daily bars and save one table version.
+    # A failed batch or ticker is left out and listed in the table's meta under "failed".
+    symbols = symbols or get_symbol_master().symbols(exchange)
+    tickers = list(dict.fromkeys(ticker_symbol(symbol, exchange) for symbol in symbols if symbol.strip()))
+    batches = [tickers[i:i + batch_size] for i in range(0, len(tickers), batch_size)]
+    rows = {}
+    failed = {}
+    with span("factor_build", exchange=exchange):
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="factors") as executor:
+            futures = {executor.submit(download_batch, batch, period): batch for batch in batches}
+            for future in as_completed(futures):
+                try:
+                    frames = future.result()
+                except Exception as e:
+                    failed.update((ticker.rsplit('.', 1)[0], str(e)) for ticker in futures[future])
+                    continue
+                for ticker, hist in frames.items():
+                    try:
+                        hist = hist.dropna(subset=['Close'])
+                        if not hist.empty:
+                            rows[ticker.rsplit('.', 1)[0]] = ticker_factors(hist)
+                    except Exception as e:
+                        failed[ticker.rsplit('.', 1)[0]] = str(e)
+        if not rows and failed:
+            # Keep the previous table rather than replacing it with an empty one
+            raise RuntimeError(f"Every batch failed, e.g. {next(iter(failed.values()))}")
+        return write_table(exchange, rows, failed)
+
+
+def write_table(exchange, rows, failed=None):
+    symbols = sorted(rows)
+    version = f"{as_of_bar()}-{int(time.time())}"
+    root = os.path.join(FACTOR_DIR, exchange.upper())
+    path = os.path.join(root, version)
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "symbols.npy"), np.array(symbols, dtype=str))
+    for name in NUMERIC_FACTORS:
+        values = np.array([rows[symbol][name] for symbol in symbols], dtype='float64')
+        np.save(os.path.join(path, f"{name}.npy"), values)
+        # np.argsort puts NaN last, so the first count_nonzero(~isnan) positions are the ranked rows
+        np.save(os.path.join(path, f"{name}.order.npy"), np.argsort(values, kind='stable').astype('int32'))
+    for name, labels in CATEGORIES.items():
+        codes = np.array([labels.index(rows[symbol][name]) for symbol in symbols], dtype='int8')
+        np.save(os.path.join(path, f"{name}.npy"), codes)
+        np.save(os.path.join(path, f"{name}.bitmap.npy"), np.packbits(codes[None, :] == np.arange(len(labels))[:, None], axis=1))
+    meta = {"rows": len(symbols), "exchange": exchange.upper(), "as_of": as_of_bar(),
+            "built_at": datetime.now().isoformat(timespec='seconds'), "version": version, "failed": failed or {}}
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    # Readers follow current.json, so the new version becomes visible in one rename
+    tmp = os.path.join(root, f".current.{os.getpid()}.json")
+    with open(tmp, "w") as f:
+        json.dump({"version": version}, f)
+    os.replace(tmp, os.path.join(root, "current.json"))
+    for old in sorted(v for v in os.listdir(root) if not v.endswith(".json"))[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+    return meta
+
+
+class FactorTable:
+    def __init__(self, path):
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.symbols = np.load(os.path.join(path, "symbols.npy"))
+        self.columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in FACTORS}
+        self.order = {name: np.load(os.path.join(path, f"{name}.order.npy"), mmap_mode='r') for name in NUMERIC_FACTORS}
+        self.bitmaps = {name: np.load(os.path.join(path, f"{name}.bitmap.npy"), mmap_mode='r') for name in CATEGORIES}
+        self._sorted = {}
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def sorted_values(self, name):
+        values = self._sorted.get(name)
+        if values is None:
+            values = self._sorted[name] = np.asarray(self.columns[name])[self.order[name]]
+        return values
+
+    def numeric_bitmap(self, name, op, value):
+        # Rows whose value satisfies `name op value`, found by binary search on the sorted index
+        values = self.sorted_values(name)
+        order = np.asarray(self.order[name])
+        valid = len(values) - np.count_nonzero(np.isnan(values))
+        left = np.searchsorted(values[:valid], value, side='left')
+        right = np.searchsorted(values[:valid], value, side='right')
+        ranges = {
+            "<": [(0, left)], "<=": [(0, right)], ">": [(right, valid)], ">=": [(left, valid)],
+            "==": [(left, right)], "=": [(left, right)], "!=": [(0, left), (right, valid)],
+        }[op]
+        mask = np.zeros(len(self), dtype=bool)
+        for start, stop in ranges:
+            mask[order[start:stop]] = True
+        return np.packbits(mask)
+
+    def category_bitmap(self, name, op, label):
+        labels = CATEGORIES[name]
+        matches = [i for i, candidate in enumerate(labels) if candidate.lower() == label.lower()]
+        if not matches or op not in ("==", "=", "!="):
+            raise ValueError(f"'{name}' takes == or != with one of {', '.join(labels)}")
+        bitmap = np.asarray(self.bitmaps[name][matches[0]])
+        if op == "!=":
+            bitmap = np.bitwise_or.reduce(np.delete(np.asarray(self.bitmaps[name]), matches[0], axis=0), axis=0)
+        return bitmap
+
+    def column_bitmap(self, name, op, other):
+        # Factor against factor, e.g. close > sma200; NaN compares false
+        with np.errstate(invalid='ignore'):
+            return np.packbits(OPERATORS[op](np.asarray(self.columns[name]), np.asarray(self.columns[other])))
+
+    def filter_bitmap(self, name, op, value):
+        if name not in self.columns:
+            raise ValueError(f"Unknown factor '{name}'")
+        if name in CATEGORIES:
+            return self.category_bitmap(name, op, str(value))
+        if isinstance(value, str):
+            if value not in NUMERIC_FACTORS:
+                raise ValueError(f"'{value}' is neither a number nor a numeric factor")
+            return self.column_bitmap(name, op, value)
+        return self.numeric_bitmap(name, op, float(value))
+
+    def query(self, filters=(), order_by=None, ascending=True, limit=None, columns=None):
+        # filters: (factor, operator, number | factor | label) triples, all of which must hold
+        with span("factor_query"):
+            bitmap = np.full((len(self) + 7) // 8, 0xFF, dtype='uint8')
+            for name, op, value in filters:
+                bitmap &= self.filter_bitmap(name, op, value)
+            mask = np.unpackbits(bitmap, count=len(self)).astype(bool)
+            if order_by is not None:
+                if order_by not in NUMERIC_FACTORS:
+                    raise ValueError(f"Cannot rank by '{order_by}'")
+                order = np.asarray(self.order[order_by])
+                valid = order[:len(self) - np.count_nonzero(np.isnan(self.sorted_values(order_by)))]
+                rows = valid if ascending else valid[::-1]
+                rows = rows[mask[rows]]
+            else:
+                rows = np.flatnonzero(mask)
+            if limit is not None:
+                rows = rows[:limit]
+            return self.frame(rows, columns)
+
+    def frame(self, rows, columns=None):
+        names = [name for name in FACTORS if columns is None or name in columns]
+        data = {'symbol': self.symbols[rows]}
+        for name in names:
+            values = np.asarray(self.columns[name])[rows]
+            data[name] = np.asarray(CATEGORIES[name], dtype=object)[values] if name in CATEGORIES else values
+        return pd.DataFrame(data)
+
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def load_table(exchange="NSE"):
+    # The current table version for an exchange, re-read only after a rebuild; None before the first build
+    root = os.path.join(FACTOR_DIR, exchange.upper())
+    try:
+        with open(os.path.join(root, "current.json")) as f:
+            version = json.load(f)["version"]
+    except (OSError, ValueError, KeyError):
+        return None
+    with _tables_lock:
+        table = _tables.get(exchange.upper())
+        if table is None or table.meta.get("version") != version:
+            try:
+                table = _tables[exchange.upper()] = FactorTable(os.path.join(root, version))
+            except (OSError, ValueError):
+                return None
+        return table
+
+
+def parse_filter(text):
+    # "rsi14 < 30", "close > sma200" or "signal == Buy"
+    match = FILTER.match(text)
+    if not match:
+        raise ValueError(f"Cannot parse filter '{text}'; use e.g. rsi14 < 30")
+    name, op, value = match.group(1).lower(), match.group(2), match.group(3)
+    try:
+        value = float(value)
+    except ValueError:
+        value = value.lower() if value.lower() in NUMERIC_FACTORS else value
+    return name, op, value
+
+
+def parse_filters(text):
+    # One filter per line or separated by semicolons
+    return [parse_filter(part) for part in re.split(r"[;\n]", text) if part.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the end-of-day factor table.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Compute factors for every symbol of an exchange")
+    build.add_argument("--exchange", default="NSE")
+    build.add_argument("--symbols", default="", help="Comma separated symbols; defaults to the exchange's symbol list")
+    build.add_argument("--period", default=BUILD_PERIOD)
+    query = commands.add_parser("query", help="Filter and rank the current table")
+    query.add_argument("filters", nargs="*", help='e.g. "rsi14 < 30" "close > sma200" "signal == Buy"')
+    query.add_argument("--exchange", default="NSE")
+    query.add_argument("--order", help="Factor to rank by")
+    query.add_argument("--descending", action="store_true")
+    query.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        symbols = [s.strip() for s in args.symbols.split(",") if s.strip()] or None
+        meta = build_table(args.exchange, symbols, args.period)
+        print(f"Built {args.exchange} factor table as of {meta['as_of']}: {meta['rows']} symbols")
+        if meta["failed"]:
+            print(f"Left out {len(meta['failed'])} symbols: {', '.join(sorted(meta['failed']))}")
+        return
+    table = load_table(args.exchange)
+    if table is None:
+        parser.exit(1, f"No {args.exchange} factor table yet; run python factors.py build --exchange {args.exchange}\n")
+    result = table.query(parse_filters(";".join(args.filters)), args.order, not args.descending, args.limit)
+    print(f"{len(result)} matches, table as of {table.meta['as_of']}")
+    print(result.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
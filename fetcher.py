@@ -0,0 +1,154 @@
+import os
+import random
+import threading
+import time
+
+import metrics
+
+# Shared scheduler for outbound Yahoo calls: a token bucket per host keeps
+# every session under one request rate, failures back off with jitter, and
+# a per-host circuit breaker fails fast while the host is unhealthy.
+YAHOO_HOST = "query2.finance.yahoo.com"
+YAHOO_CHART_HOST = "query1.finance.yahoo.com"
+# Point ticker validation at a local stub for offline benchmarks and load tests
+YAHOO_CHART_URL = os.getenv("MARKETMIND_YAHOO_CHART_URL", f"https://{YAHOO_CHART_HOST}/v8/finance/chart")
+# "chart" reads price history from YAHOO_CHART_URL directly instead of through yfinance
+HISTORY_SOURCE = os.getenv("MARKETMIND_HISTORY_SOURCE", "yfinance")
+RATE = float(os.getenv("MARKETMIND_YAHOO_RATE", "2"))
+BURST = int(os.getenv("MARKETMIND_YAHOO_BURST", "5"))
+FAILURE_THRESHOLD = int(os.getenv("MARKETMIND_BREAKER_FAILURES", "5"))
+RESET_TIMEOUT = float(os.getenv("MARKETMIND_BREAKER_RESET", "30"))
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class RateLimited(Exception):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=0.0):
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            # Let a single probe through once the reset timeout has passed
+            if state == "half-open" and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+    def release(self):
+        # The probe ended without reaching the host (e.g. rate limited); let the next call probe instead
+        with self._lock:
+            self.probing = False
+
+
+def backoff_delay(attempt, base=0.5, cap=8.0):
+    # Full jitter: a random delay up to the exponential bound
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class FetchScheduler:
+    def __init__(self, rate=RATE, burst=BURST):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+        self.breakers = {}
+        self._lock = threading.Lock()
+
+    def _for_host(self, host):
+        with self._lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rate, self.burst)
+                self.breakers[host] = CircuitBreaker()
+            return self.buckets[host], self.breakers[host]
+
+    def call(self, host, fn, retries=3, deadline=15.0, queue_timeout=5.0):
+        bucket, breaker = self._for_host(host)
+        give_up_at = time.monotonic() + deadline
+        for attempt in range(retries):
+            if not breaker.allow():
+                metrics.inc("yahoo_circuit_open", host=host)
+                raise CircuitOpen(f"{host} is failing, retrying after {breaker.reset_timeout:.0f}s")
+            if not bucket.acquire(timeout=min(queue_timeout, max(give_up_at - time.monotonic(), 0))):
+                breaker.release()
+                metrics.inc("yahoo_rate_limited", host=host)
+                raise RateLimited(f"Too many requests queued for {host}")
+            metrics.inc("yahoo_requests", host=host)
+            try:
+                result = fn()
+            except Exception:
+                metrics.inc("yahoo_failures", host=host)
+                breaker.record_failure()
+                delay = backoff_delay(attempt)
+                if attempt == retries - 1 or time.monotonic() + delay > give_up_at:
+                    raise
+                metrics.inc("yahoo_retries", host=host)
+                time.sleep(delay)
+                continue
+            except BaseException:
+                breaker.release()
+                raise
+            breaker.record_success()
+            return result
+
+    def status(self):
+        with self._lock:
+            return {host: breaker.state for host, breaker in self.breakers.items()}
+
+
+scheduler = FetchScheduler()
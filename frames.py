@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+
+from indicators import INDICATORS, IndicatorEngine
+from metrics import span
+
+# Compact daily price container shared through the history cache: float32
+# prices, uint32 volume (int64 when a bar's volume does not fit) and an int32
+# epoch-day index, all read-only: 24 bytes a bar against 48 as a DataFrame. Indicator
+# columns are computed on first use and kept beside the prices, so sessions
+# share them and never add columns to the base data. Time frame windows are
+# views of one full history, and weekly/monthly bars are derived from it
+# once, each resolution with its own indicator columns.
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+NS_PER_DAY = 86_400 * 1_000_000_000
+UINT32_MAX = np.iinfo('uint32').max
+RULES = ("W", "M")
+
+
+def _read_only(arr):
+    arr.flags.writeable = False
+    return arr
+
+
+def epoch_days(index):
+    # Days since 1970-01-01 in the index's own timezone
+    local = index.tz_localize(None) if index.tz is not None else index
+    ns = local.values.astype('datetime64[ns]').view('int64')
+    return ns // NS_PER_DAY, ns % NS_PER_DAY
+
+
+def epoch_day(timestamp):
+    return (pd.Timestamp(timestamp).tz_localize(None).normalize() - pd.Timestamp("1970-01-01")).days
+
+
+def period_starts(days, rule):
+    # Position of the first bar of each week (Monday to Sunday) or calendar month
+    days = np.asarray(days, dtype='int64')
+    if rule == "W":
+        # Epoch day 0 was a Thursday, so shifting by 3 puts week boundaries on Mondays
+        key = (days + 3) // 7
+    elif rule == "M":
+        key = days.astype('datetime64[D]').astype('datetime64[M]').astype('int64')
+    else:
+        raise ValueError(f"Unsupported resample rule '{rule}', use one of {', '.join(RULES)}")
+    if len(key) == 0:
+        return np.empty(0, dtype=np.intp)
+    return np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+
+
+def reduce_ohlcv(starts, open_, high, low, close, volume):
+    # One reduceat pass per column; each bar is labelled with its first day
+    if len(starts) == 0:
+        return open_[:0], high[:0], low[:0], close[:0], volume[:0]
+    ends = np.r_[starts[1:], len(close)] - 1
+    return (open_[starts], np.maximum.reduceat(high, starts), np.minimum.reduceat(low, starts),
+            close[ends], np.add.reduceat(volume, starts, dtype='int64'))
+
+
+def resample_frame(hist, rule):
+    # DataFrame counterpart of PriceFrame.resample for bars that do not fit an epoch-day index
+    starts = period_starts(epoch_days(hist.index)[0], rule)
+    columns = reduce_ohlcv(starts, *(hist[col].to_numpy() for col in PRICE_COLUMNS + ['Volume']))
+    return pd.DataFrame(dict(zip(PRICE_COLUMNS + ['Volume'], columns)), index=hist.index[starts])
+
+
+class PriceFrame:
+    __slots__ = ("days", "open", "high", "low", "close", "volume", "tz", "index_name", "_derived", "_base", "_offset", "_resampled", "_listener")
+
+    def __init__(self, days, open_, high, low, close, volume, tz=None, index_name="Date"):
+        self.days = days
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.tz = tz
+        self.index_name = index_name
+        self._derived = {}
+        self._base = None
+        self._offset = 0
+        self._resampled = {}
+        self._listener = None
+
+    @classmethod
+    def from_frame(cls, hist):
+        # Only bars that start at midnight fit an epoch-day index; returns None otherwise
+        days, remainder = epoch_days(hist.index)
+        if remainder.any():
+            return None
+        columns = [_read_only(hist[col].to_numpy(dtype='float32', copy=True)) for col in PRICE_COLUMNS]
+        volume = hist['Volume'].to_numpy(dtype='int64', copy=True)
+        if len(volume) and volume.min() >= 0 and volume.max() <= UINT32_MAX:
+            volume = volume.astype('uint32')
+        volume = _read_only(volume)
+        return cls(_read_only(days.astype('int32')), *columns, volume, tz=hist.index.tz, index_name=hist.index.name or "Date")
+
+    def __len__(self):
+        return len(self.days)
+
+    @property
+    def empty(self):
+        return len(self.days) == 0
+
+    @property
+    def nbytes(self):
+        return sum(arr.nbytes for arr in (self.days, self.open, self.high, self.low, self.close, self.volume)) + \
+            sum(arr.nbytes for cols in list(self._derived.values()) for arr in cols.values()) + \
+            sum(prices.nbytes for prices in list(self._resampled.values()))
+
+    @property
+    def index(self):
+        index = pd.DatetimeIndex(self.days.astype('int64') * NS_PER_DAY, dtype='datetime64[ns]', name=self.index_name)
+        return index.tz_localize(self.tz) if self.tz is not None else index
+
+    def set_listener(self, listener):
+        # listener() is called after derived columns or resampled bars are added, e.g. to re-size a cache entry
+        self._listener = listener
+
+    def _grew(self):
+        if self._listener is not None:
+            self._listener()
+
+    def window(self, start=0):
+        # Bars from position start on, as views of the full series
+        base, offset = (self._base, self._offset + start) if self._base is not None else (self, start)
+        if offset <= 0:
+            return base
+        view = PriceFrame(base.days[offset:], base.open[offset:], base.high[offset:], base.low[offset:],
+                          base.close[offset:], base.volume[offset:], tz=base.tz, index_name=base.index_name)
+        view._base, view._offset = base, offset
+        return view
+
+    def since(self, day):
+        # Window from the first bar on or after an epoch day
+        return self.window(int(np.searchsorted(self.days, day)))
+
+    def resample(self, rule):
+        # Weekly ("W") or monthly ("M") bars, built once from the full series and shared
+        if self._base is not None:
+            resampled = self._base.resample(rule)
+            return resampled.since(int(self.days[0])) if len(self) else resampled.window(len(resampled))
+        prices = self._resampled.get(rule)
+        if prices is None:
+            starts = period_starts(self.days, rule)
+            columns = [_read_only(values) for values in reduce_ohlcv(starts, self.open, self.high, self.low, self.close, self.volume)]
+            prices = self._resampled[rule] = PriceFrame(_read_only(self.days[starts]), *columns, tz=self.tz, index_name=self.index_name)
+            # Indicators added to the resampled bars count towards this frame's size
+            prices.set_listener(self._grew)
+            self._grew()
+        return prices
+
+    def indicator_columns(self, selected_indicators):
+        # Computed once over the whole series on first request, then shared; windows get views that
+        # include the warm-up from bars before the window
+        if self._base is not None:
+            return {col: values[self._offset:] for col, values in self._base.indicator_columns(selected_indicators).items()}
+        names = [name for name in INDICATORS if name in selected_indicators]
+        missing = [name for name in names if name not in self._derived]
+        if missing:
+            with span("indicators"):
+                engine = IndicatorEngine(missing)
+                close = self.close.astype('float64')
+                intermediates = {key: node.fit(close) for key, node in engine.nodes.items()}
+                for name in missing:
+                    self._derived[name] = {col: _read_only(np.asarray(values, dtype='float32'))
+                                           for col, values in INDICATORS[name].compute(intermediates).items()}
+            self._grew()
+        columns = {}
+        for name in names:
+            columns.update(self._derived[name])
+        return columns
+
+    def frame(self, selected_indicators=()):
+        # A DataFrame over the stored arrays; nothing is copied
+        columns = {'Open': self.open, 'High': self.high, 'Low': self.low, 'Close': self.close, 'Volume': self.volume}
+        columns.update(self.indicator_columns(selected_indicators))
+        return pd.DataFrame(columns, index=self.index, copy=False)
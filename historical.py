@@ -1,56 +1,237 @@
 import yfinance as yf
+import numpy as np
 import pandas as pd
 import requests
+import os
 import time
+from collections import namedtuple
 import streamlit as st
+import store
+from cache import as_of_bar, history_cache
+from symbols import get_symbol_master
+from metrics import timed
+from frames import PriceFrame, epoch_day, resample_frame
+from fetcher import CircuitOpen, RateLimited, YAHOO_CHART_HOST, YAHOO_CHART_URL, YAHOO_HOST, HISTORY_SOURCE, scheduler
 
+@timed("validate")
 def validate_ticker(symbol, exchange):
     suffix = ".NS" if exchange.upper() == "NSE" else ".BO"
     ticker = f"{symbol}{suffix}"
+    master = get_symbol_master()
+    if master.contains(symbol, exchange):
+        return True, ticker
+    if master.is_known_invalid(symbol, exchange):
+        return False, ticker
     try:
-        url = f"https://query1.finance.yahoo.com/v8/finance/chart/{ticker}"
+        url = f"{YAHOO_CHART_URL}/{ticker}"
         headers = {"User-Agent": "Mozilla/5.0"}
-        response = requests.get(url, headers=headers, timeout=5)
+        response = scheduler.call(YAHOO_CHART_HOST, lambda: requests.get(url, headers=headers, timeout=5), retries=1)
         if response.status_code == 200 and response.json().get("chart", {}).get("result"):
+            master.add(symbol, exchange)
             return True, ticker
+        if response.status_code == 404 or response.status_code == 200:
+            master.mark_invalid(symbol, exchange)
         return False, ticker
     except Exception:
-        return False, ticker
+        # Yahoo is unreachable; a ticker we have stored data for is still valid
+        return store.read_meta(ticker) is not None, ticker
+
+def as_utc(value):
+    value = pd.Timestamp(value)
+    return value.tz_localize('UTC') if value.tz is None else value
+
+def chart_history(ticker_symbol, period=None, interval="1d", start=None, end=None):
+    # Same frame as yf.Ticker.history(auto_adjust=True), read from the v8 chart endpoint
+    params = {"interval": interval, "events": "div,splits", "includeAdjustedClose": "true"}
+    if start is not None:
+        params["period1"] = int(as_utc(start).timestamp())
+        params["period2"] = int(as_utc(end).timestamp()) if end is not None else int(time.time())
+    else:
+        params["range"] = period or "1mo"
+    response = requests.get(f"{YAHOO_CHART_URL}/{ticker_symbol}", params=params, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
+    if response.status_code == 404:
+        return pd.DataFrame(columns=store.COLUMNS)
+    response.raise_for_status()
+    result = (response.json().get("chart") or {}).get("result")
+    if not result or not result[0].get("timestamp"):
+        return pd.DataFrame(columns=store.COLUMNS)
+    result = result[0]
+    quote = result["indicators"]["quote"][0]
+    hist = pd.DataFrame({col: np.array(quote[col.lower()], dtype='float64') for col in store.COLUMNS})
+    index = pd.to_datetime(result["timestamp"], unit='s', utc=True).tz_convert(result["meta"].get("exchangeTimezoneName", "UTC"))
+    hist.index = index.normalize().rename("Date") if interval == "1d" else index.rename("Datetime")
+    adjclose = result["indicators"].get("adjclose")
+    if adjclose:
+        factor = np.array(adjclose[0]["adjclose"], dtype='float64') / hist['Close'].to_numpy()
+        for col in ['Open', 'High', 'Low', 'Close']:
+            hist[col] = hist[col].to_numpy() * factor
+    hist = hist[hist['Close'].notna()]
+    return hist.assign(Volume=hist['Volume'].fillna(0).astype('int64'))
+
+def yahoo_history(ticker_symbol, **kwargs):
+    if HISTORY_SOURCE == "chart":
+        return scheduler.call(YAHOO_CHART_HOST, lambda: chart_history(ticker_symbol, **kwargs))
+    return scheduler.call(YAHOO_HOST, lambda: yf.Ticker(ticker_symbol).history(auto_adjust=True, timeout=10, **kwargs))
+
+def clean_history(hist):
+    hist = hist[store.COLUMNS]
+    if hist.index.duplicated().any():
+        hist = hist[~hist.index.duplicated(keep='first')]
+    return hist
+
+def covered_from(period):
+    return "max" if period == "max" else store.period_start(period).date().isoformat()
+
+@timed("fetch")
+def fetch_history(ticker_symbol, period):
+    # Serve from the local store and only ask Yahoo for what is missing
+    stored, meta = store.read_partition(ticker_symbol)
+    if stored is None or stored.empty:
+        fresh = yahoo_history(ticker_symbol, period=period)
+        if fresh.empty:
+            return fresh
+        hist = clean_history(fresh)
+        store.write_partition(ticker_symbol, hist, covered_from(period))
+        return store.slice_period(hist, period)
+
+    covered = meta["covered_from"]
+    fetched = []
+    if not store.covers(meta, period):
+        # Widen the stored range backwards instead of downloading the whole period again
+        if period == "max":
+            fetched.append(yahoo_history(ticker_symbol, period="max"))
+        else:
+            fetched.append(yahoo_history(ticker_symbol, start=covered_from(period), end=stored.index[0].strftime('%Y-%m-%d')))
+        covered = covered_from(period)
+    if not store.checked_today(meta):
+        # Start one bar early so a complete stored bar overlaps; the fresh bars replace the last
+        # stored one, which may have been saved mid-session
+        overlap = stored.index[-2] if len(stored) > 1 else stored.index[-1]
+        fresh = yahoo_history(ticker_symbol, start=overlap.strftime('%Y-%m-%d'))
+        # Prices were re-adjusted for a split or dividend, so the stored history is stale
+        if store.readjusted(stored, fresh):
+            if covered == "max":
+                refetched = yahoo_history(ticker_symbol, period="max")
+            else:
+                refetched = yahoo_history(ticker_symbol, start=covered)
+            if not refetched.empty:
+                fresh, stored, fetched = refetched, None, []
+        fetched.append(fresh)
+
+    hist = stored
+    for fresh in fetched:
+        if not fresh.empty:
+            hist = store.merge(hist, clean_history(fresh))
+    if not fetched:
+        return store.slice_period(hist, period)
+    store.write_partition(ticker_symbol, hist, covered)
+    return store.slice_period(hist, period)
 
-def get_historical_data(symbol, time_frame="1y", exchange="NSE"):
+def intraday_period(time_frame, interval):
+    # Yahoo keeps 1m bars for about a week and other intraday bars for 60 days
+    limit = "5d" if interval == "1m" else "1mo"
+    order = ["1d", "5d", "1mo"]
+    return time_frame if time_frame in order and order.index(time_frame) <= order.index(limit) else limit
+
+@timed("fetch_intraday")
+def fetch_intraday(ticker_symbol, interval, period="1d", start=None):
+    # Intraday bars bypass the daily store; start fetches only bars from that time on
+    if start is not None:
+        fresh = yahoo_history(ticker_symbol, interval=interval, start=start)
+    else:
+        fresh = yahoo_history(ticker_symbol, interval=interval, period=period)
+    return fresh if fresh.empty else clean_history(fresh)
+
+def last_good_history(ticker_symbol, period):
+    stored, meta = store.read_partition(ticker_symbol)
+    if stored is None or stored.empty:
+        return None, None
+    hist = store.slice_period(stored, period)
+    return (hist if not hist.empty else stored), meta.get("updated_at")
+
+INTERVAL_SECONDS = {"1m": 60, "2m": 120, "5m": 300, "15m": 900, "30m": 1800, "60m": 3600}
+# Weekly and monthly bars are aggregated from the cached daily history, not downloaded
+RESAMPLED = {"1wk": "W", "1mo": "M"}
+# Daily history is fetched and cached once per ticker at this period; shorter time frames are windows of it
+BASE_PERIOD = os.getenv("MARKETMIND_BASE_PERIOD", "max")
+PERIOD_ORDER = ["1d", "5d", "1mo", "3mo", "6mo", "ytd", "1y", "2y", "5y", "10y", "max"]
+
+def base_period(period):
+    if period not in PERIOD_ORDER or BASE_PERIOD not in PERIOD_ORDER:
+        return period
+    return max(period, BASE_PERIOD, key=PERIOD_ORDER.index)
+
+def window(prices, period, interval="1d"):
+    # One time frame at one resolution out of the cached base history; PriceFrames give views
+    if interval in RESAMPLED:
+        prices = prices.resample(RESAMPLED[interval]) if isinstance(prices, PriceFrame) else resample_frame(prices, RESAMPLED[interval])
+    if not isinstance(prices, PriceFrame):
+        return store.slice_period(prices, period)
+    start = store.period_start(period)
+    return prices if start is None else prices.since(epoch_day(start))
+
+def compact(hist):
+    # Daily bars are cached as a PriceFrame; anything else stays a DataFrame
+    prices = PriceFrame.from_frame(hist) if not hist.empty else None
+    return prices if prices is not None else hist
+
+# prices is the cached PriceFrame behind hist when there is one
+HistoryResult = namedtuple("HistoryResult", ["hist", "ticker", "error", "warning", "prices"], defaults=[None])
+
+def load_history(symbol, time_frame="1y", exchange="NSE", interval="1d"):
+    # Streamlit-free loader shared by the app and the HTTP API
     symbol = symbol.strip().replace("$", "").upper()
     is_valid, ticker_symbol = validate_ticker(symbol, exchange)
     if not is_valid:
-        st.session_state['error'] = f"Invalid ticker '{ticker_symbol}'. It may not exist on {exchange}. For example, 'AAPL' is listed on NASDAQ, not NSE."
-        return pd.DataFrame()
+        return HistoryResult(pd.DataFrame(), ticker_symbol, f"Invalid ticker '{ticker_symbol}'. It may not exist on {exchange}. For example, 'AAPL' is listed on NASDAQ, not NSE.", None)
 
-    periods = [time_frame, "1y"] if time_frame == "1mo" else [time_frame]
-    max_retries = 3
+    daily = interval == "1d" or interval in RESAMPLED
+    # "1mo" widens once to "1y" when it comes back empty
+    periods = [time_frame, "1y"] if time_frame == "1mo" and daily else [time_frame]
+    error = None
     for period in periods:
-        for attempt in range(max_retries):
-            try:
-                ticker = yf.Ticker(ticker_symbol)
-                hist = ticker.history(period=period, auto_adjust=True, timeout=10)
-                if hist.empty:
-                    st.session_state['error'] = f"No data found for '{ticker_symbol}' on {exchange} for period '{period}'. Try a different period or check the symbol."
-                    continue
-                hist = hist[['Open', 'High', 'Low', 'Close', 'Volume']]
-                if hist.index.duplicated().any():
-                    hist = hist[~hist.index.duplicated(keep='first')]
-                if len(hist) < 10:
-                    st.session_state['warning'] = f"Only {len(hist)} data points fetched for '{ticker_symbol}'. Consider a longer time frame."
-                st.write(f"Debug: Fetched {len(hist)} rows for {ticker_symbol} with columns: {hist.columns.tolist()}")
-                if 'error' in st.session_state:
-                    del st.session_state['error']
-                return hist
-            except Exception as e:
-                if "Expecting value: line 1 column 1" in str(e):
-                    st.session_state['error'] = f"Failed to fetch data for '{ticker_symbol}'. The ticker may be invalid or not listed on {exchange}."
-                else:
-                    st.session_state['error'] = f"Error fetching data for '{ticker_symbol}': {str(e)}"
-                if attempt < max_retries - 1:
-                    time.sleep(2)
-                    continue
-        if period == periods[-1]:
-            return pd.DataFrame()
-    return pd.DataFrame()
\ No newline at end of file
+        try:
+            if daily:
+                # Every time frame and bar size of a ticker shares one cached fetch of its longest history
+                base = base_period(period)
+                hist = window(history_cache.get_or_load((ticker_symbol, base, as_of_bar()), lambda: compact(fetch_history(ticker_symbol, base))), period, interval)
+            else:
+                # Intraday entries are keyed by the current bar so they expire as bars close
+                period = intraday_period(period, interval)
+                bar = int(time.time() // INTERVAL_SECONDS[interval])
+                hist = history_cache.get_or_load((ticker_symbol, period, interval, bar), lambda: fetch_intraday(ticker_symbol, interval, period))
+        except Exception as e:
+            stale, updated_at = last_good_history(ticker_symbol, period) if daily else (None, None)
+            if stale is not None and interval in RESAMPLED:
+                stale = resample_frame(stale, RESAMPLED[interval])
+            if stale is not None:
+                return HistoryResult(stale, ticker_symbol, None, f"Yahoo Finance is not responding, showing data stored at {updated_at}.")
+            if isinstance(e, (CircuitOpen, RateLimited)):
+                error = f"Yahoo Finance is busy or unavailable right now ({e}). Please try again shortly."
+            elif "Expecting value: line 1 column 1" in str(e):
+                error = f"Failed to fetch data for '{ticker_symbol}'. The ticker may be invalid or not listed on {exchange}."
+            else:
+                error = f"Error fetching data for '{ticker_symbol}': {str(e)}"
+            break
+        if hist.empty:
+            error = f"No data found for '{ticker_symbol}' on {exchange} for period '{period}'. Try a different period or check the symbol."
+            continue
+        warning = None
+        if len(hist) < 10:
+            warning = f"Only {len(hist)} data points fetched for '{ticker_symbol}'. Consider a longer time frame."
+        if isinstance(hist, PriceFrame):
+            return HistoryResult(hist.frame(), ticker_symbol, None, warning, hist)
+        return HistoryResult(hist, ticker_symbol, None, warning)
+    return HistoryResult(pd.DataFrame(), ticker_symbol, error, None)
+
+def get_historical_data(symbol, time_frame="1y", exchange="NSE", interval="1d"):
+    hist, ticker_symbol, error, warning, prices = load_history(symbol, time_frame, exchange, interval)
+    if error:
+        st.session_state['error'] = error
+        return hist
+    if warning:
+        st.session_state['warning'] = warning
+    if 'error' in st.session_state:
+        del st.session_state['error']
+    # The app reads indicator columns from the shared PriceFrame rather than adding them to hist
+    return prices if prices is not None else hist
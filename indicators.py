@@ -1,17 +1,203 @@
+from collections import deque, namedtuple
+
+import numpy as np
 import pandas as pd
 
-def add_indicators(hist, selected_indicators):
-    if "Moving Average (MA)" in selected_indicators:
-        hist['MA'] = hist['Close'].rolling(window=20).mean()
-    if "Relative Strength Index (RSI)" in selected_indicators:
-        delta = hist['Close'].diff()
-        gain = delta.where(delta > 0, 0).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        hist['RSI'] = 100 - (100 / (1 + rs))
-    if "Bollinger Bands" in selected_indicators:
-        hist['BB_Upper'] = hist['Close'].rolling(window=20).mean() + (2 * hist['Close'].rolling(window=20).std())
-        hist['BB_Lower'] = hist['Close'].rolling(window=20).mean() - (2 * hist['Close'].rolling(window=20).std())
-    if "MACD" in selected_indicators:
-        hist['MACD'] = hist['Close'].ewm(span=12, adjust=False).mean() - hist['Close'].ewm(span=26, adjust=False).mean()
+from metrics import span
+
+# Indicator engine: every dropdown indicator declares the intermediates it
+# needs, each intermediate is computed once per run and keeps a small
+# running state so new bars can be appended without touching the history.
+
+
+class RollingStats:
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def fit(self, close):
+        rolling = pd.Series(close).rolling(window=self.window)
+        tail = close[-self.window:]
+        self.values = deque(tail.tolist(), maxlen=self.window)
+        self.total = float(tail.sum())
+        self.total_sq = float((tail * tail).sum())
+        return {"mean": rolling.mean().to_numpy(), "std": rolling.std().to_numpy()}
+
+    def update(self, x):
+        if len(self.values) == self.window:
+            old = self.values[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(x)
+        self.total += x
+        self.total_sq += x * x
+        n = len(self.values)
+        if n < self.window:
+            return {"mean": np.float64(np.nan), "std": np.float64(np.nan)}
+        variance = max((self.total_sq - self.total * self.total / n) / (n - 1), 0.0)
+        return {"mean": np.float64(self.total / n), "std": np.float64(np.sqrt(variance))}
+
+
+class GainLoss:
+    def __init__(self, window):
+        self.window = window
+        self.prev = None
+        self.gains = deque(maxlen=window)
+        self.losses = deque(maxlen=window)
+        self.gain_total = 0.0
+        self.loss_total = 0.0
+
+    def fit(self, close):
+        delta = np.diff(close, prepend=np.nan)
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+        self.prev = float(close[-1]) if len(close) else None
+        self.gains = deque(gain[-self.window:].tolist(), maxlen=self.window)
+        self.losses = deque(loss[-self.window:].tolist(), maxlen=self.window)
+        self.gain_total = sum(self.gains)
+        self.loss_total = sum(self.losses)
+        return {
+            "avg_gain": pd.Series(gain).rolling(window=self.window).mean().to_numpy(),
+            "avg_loss": pd.Series(loss).rolling(window=self.window).mean().to_numpy(),
+        }
+
+    def update(self, x):
+        delta = x - self.prev if self.prev is not None else 0.0
+        self.prev = x
+        if len(self.gains) == self.window:
+            self.gain_total -= self.gains[0]
+            self.loss_total -= self.losses[0]
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        self.gains.append(gain)
+        self.losses.append(loss)
+        self.gain_total += gain
+        self.loss_total += loss
+        if len(self.gains) < self.window:
+            return {"avg_gain": np.float64(np.nan), "avg_loss": np.float64(np.nan)}
+        return {"avg_gain": np.float64(self.gain_total / self.window), "avg_loss": np.float64(self.loss_total / self.window)}
+
+
+class EMA:
+    def __init__(self, span):
+        self.alpha = 2 / (span + 1)
+        self.span = span
+        self.last = None
+
+    def fit(self, close):
+        ema = pd.Series(close).ewm(span=self.span, adjust=False).mean().to_numpy()
+        self.last = float(ema[-1]) if len(ema) else None
+        return {"value": ema}
+
+    def update(self, x):
+        self.last = x if self.last is None else self.alpha * x + (1 - self.alpha) * self.last
+        return {"value": np.float64(self.last)}
+
+
+def _rsi(gain_loss):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = gain_loss["avg_gain"] / gain_loss["avg_loss"]
+        return 100 - (100 / (1 + rs))
+
+
+INTERMEDIATES = {
+    "rolling20": lambda: RollingStats(20),
+    "gain_loss14": lambda: GainLoss(14),
+    "ema12": lambda: EMA(12),
+    "ema26": lambda: EMA(26),
+}
+
+Indicator = namedtuple("Indicator", ["requires", "compute"])
+
+INDICATORS = {
+    "Moving Average (MA)": Indicator(("rolling20",), lambda d: {"MA": d["rolling20"]["mean"]}),
+    "Relative Strength Index (RSI)": Indicator(("gain_loss14",), lambda d: {"RSI": _rsi(d["gain_loss14"])}),
+    "Bollinger Bands": Indicator(("rolling20",), lambda d: {
+        "BB_Upper": d["rolling20"]["mean"] + (2 * d["rolling20"]["std"]),
+        "BB_Lower": d["rolling20"]["mean"] - (2 * d["rolling20"]["std"]),
+    }),
+    "MACD": Indicator(("ema12", "ema26"), lambda d: {"MACD": d["ema12"]["value"] - d["ema26"]["value"]}),
+}
+
+
+class IndicatorEngine:
+    def __init__(self, selected_indicators):
+        self.reset(selected_indicators)
+
+    def reset(self, selected_indicators):
+        self.selected = [name for name in INDICATORS if name in selected_indicators]
+        needed = {key for name in self.selected for key in INDICATORS[name].requires}
+        self.nodes = {key: INTERMEDIATES[key]() for key in INTERMEDIATES if key in needed}
+        self.columns = {}
+        self.n = 0
+        self.first_index = None
+        self.last_index = None
+        self.last_close = None
+
+    def _combine(self, intermediates):
+        columns = {}
+        for name in self.selected:
+            columns.update(INDICATORS[name].compute(intermediates))
+        return columns
+
+    def fit(self, close):
+        close = np.asarray(close, dtype='float64')
+        self.columns = self._combine({key: node.fit(close) for key, node in self.nodes.items()})
+        self.n = len(close)
+        self.last_close = float(close[-1]) if len(close) else None
+        return self.columns
+
+    def update(self, new_close):
+        rows = []
+        for x in np.asarray(new_close, dtype='float64').tolist():
+            rows.append(self._combine({key: node.update(x) for key, node in self.nodes.items()}))
+            self.last_close = x
+        if rows:
+            for col in self.columns:
+                self.columns[col] = np.concatenate([self.columns[col], [row[col] for row in rows]])
+            self.n += len(rows)
+        return rows
+
+    def can_extend(self, hist, selected_indicators):
+        if self.n == 0 or len(hist) < self.n or self.selected != [name for name in INDICATORS if name in selected_indicators]:
+            return False
+        return (hist.index[0] == self.first_index and hist.index[self.n - 1] == self.last_index
+                and hist['Close'].iloc[self.n - 1] == self.last_close)
+
+
+# Cross-sectional versions for (bars x tickers) matrices; NaN marks a missing bar
+def rolling_mean_matrix(values, window, min_periods=None):
+    values = np.asarray(values, dtype='float64')
+    min_periods = window if min_periods is None else min_periods
+    valid = ~np.isnan(values)
+    sums = np.cumsum(np.where(valid, values, 0.0), axis=0)
+    counts = np.cumsum(valid, axis=0)
+    sums[window:] = sums[window:] - sums[:-window]
+    counts[window:] = counts[window:] - counts[:-window]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(counts >= max(min_periods, 1), sums / counts, np.nan)
+
+
+def rsi_matrix(close, window=14):
+    delta = np.diff(np.asarray(close, dtype='float64'), axis=0, prepend=np.nan)
+    gain = rolling_mean_matrix(np.where(delta > 0, delta, 0.0), window)
+    loss = rolling_mean_matrix(np.where(delta < 0, -delta, 0.0), window)
+    return _rsi({"avg_gain": gain, "avg_loss": loss})
+
+
+def add_indicators(hist, selected_indicators, engine=None):
+    if engine is None:
+        engine = IndicatorEngine(selected_indicators)
+    close = hist['Close'].to_numpy(dtype='float64')
+    with span("indicators"):
+        if engine.can_extend(hist, selected_indicators):
+            engine.update(close[engine.n:])
+        else:
+            engine.reset(selected_indicators)
+            engine.fit(close)
+    if len(hist):
+        engine.first_index, engine.last_index = hist.index[0], hist.index[-1]
+    for col, values in engine.columns.items():
+        hist[col] = values
     return hist
@@ -0,0 +1,192 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from historical import INTERVAL_SECONDS, fetch_intraday, intraday_period
+from indicators import INDICATORS, IndicatorEngine
+from store import COLUMNS
+
+# Live intraday mode: one poller per (ticker, interval, indicators) shared by
+# every session. Closed bars go into a fixed-size ring buffer and indicators
+# advance from their running state, so a watch screen stays flat in memory
+# and CPU however long it runs.
+CAPACITY = int(os.getenv("MARKETMIND_LIVE_BARS", "750"))
+POLL_SECONDS = float(os.getenv("MARKETMIND_LIVE_POLL", "60"))
+IDLE_TIMEOUT = float(os.getenv("MARKETMIND_LIVE_IDLE", "300"))
+
+_feeds = {}
+_feeds_lock = threading.Lock()
+
+
+class RingBuffer:
+    def __init__(self, capacity, columns):
+        self.capacity = capacity
+        self.columns = list(columns)
+        self.times = np.zeros(capacity, dtype='int64')
+        self.values = np.full((capacity, len(self.columns)), np.nan)
+        self.count = 0
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, timestamp, row):
+        slot = self.count % self.capacity
+        self.times[slot] = timestamp
+        self.values[slot] = row
+        self.count += 1
+
+    def ordered(self):
+        # Slot numbers of the retained rows, oldest first
+        return np.arange(self.count - len(self), self.count) % self.capacity
+
+    def last_time(self):
+        return int(self.times[(self.count - 1) % self.capacity]) if self.count else None
+
+
+class LiveFeed:
+    def __init__(self, ticker_symbol, interval, indicators, capacity=CAPACITY):
+        self.ticker_symbol = ticker_symbol
+        self.interval = interval
+        self.indicators = list(indicators)
+        self.capacity = capacity
+        self.engine = IndicatorEngine(self.indicators)
+        self.buffer = None
+        self.partial = None
+        self.tz = None
+        self.index_name = "Datetime"
+        self.version = 0
+        self.error = None
+        self.last_read = time.monotonic()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _split_closed(self, bars):
+        # A bar is closed once its interval has fully elapsed; the rest is still forming
+        ends = bars.index.tz_convert('UTC').tz_localize(None).values.astype('datetime64[ns]').view('int64')
+        ends = ends + INTERVAL_SECONDS[self.interval] * 1_000_000_000
+        closed = ends <= time.time_ns()
+        return bars[closed], bars[~closed]
+
+    def seed(self):
+        bars = fetch_intraday(self.ticker_symbol, self.interval, intraday_period("5d", self.interval))
+        if bars.empty:
+            raise LookupError(f"No intraday data for '{self.ticker_symbol}' at {self.interval}.")
+        closed, forming = self._split_closed(bars)
+        # Warm the indicators on every seeded bar, keep only the last `capacity` in memory
+        columns = self.engine.fit(closed['Close'].to_numpy(dtype='float64'))
+        names = list(columns)
+        tail = closed.iloc[-self.capacity:]
+        indicator_values = [np.asarray(columns[name][-len(tail):]) for name in names]
+        with self._lock:
+            self.tz = bars.index.tz
+            self.index_name = bars.index.name or "Datetime"
+            self.buffer = RingBuffer(self.capacity, COLUMNS + names)
+            times = tail.index.tz_convert('UTC').tz_localize(None).values.astype('datetime64[ns]').view('int64')
+            rows = np.column_stack([tail[COLUMNS].to_numpy(dtype='float64')] + indicator_values)
+            for timestamp, row in zip(times, rows):
+                self.buffer.append(timestamp, row)
+            self.partial = forming.iloc[-1:] if len(forming) else None
+            self.version += 1
+        # The buffer holds the indicator history, so the engine only keeps its running state
+        self.engine.columns = {}
+
+    def poll(self):
+        last = self.buffer.last_time()
+        if last is None:
+            return self.seed()
+        since = pd.Timestamp(last, tz='UTC')
+        bars = fetch_intraday(self.ticker_symbol, self.interval, start=since)
+        if not bars.empty:
+            bars = bars[bars.index > since]
+        closed, forming = self._split_closed(bars)
+        names = self.buffer.columns[len(COLUMNS):]
+        with self._lock:
+            times = closed.index.tz_convert('UTC').tz_localize(None).values.astype('datetime64[ns]').view('int64')
+            for timestamp, ohlcv in zip(times, closed[COLUMNS].to_numpy(dtype='float64')):
+                row = self.engine.update([ohlcv[3]])[0]
+                self.buffer.append(timestamp, np.concatenate([ohlcv, [row[name] for name in names]]))
+            partial = forming.iloc[-1:] if len(forming) else None
+            if len(closed) or partial is not None or self.partial is not None:
+                self.partial = partial
+                self.version += 1
+
+    def snapshot(self, since=None):
+        # Bars after `since` (a timestamp), plus the forming bar without indicators
+        self.last_read = time.monotonic()
+        if since is not None:
+            since = pd.Timestamp(since)
+            since = since.tz_localize('UTC') if since.tz is None else since
+        with self._lock:
+            order = self.buffer.ordered()
+            times = self.buffer.times[order]
+            if since is not None:
+                order = order[np.searchsorted(times, since.value, side='right'):]
+                times = self.buffer.times[order]
+            index = pd.DatetimeIndex(times.view('datetime64[ns]'), name=self.index_name).tz_localize('UTC').tz_convert(self.tz)
+            hist = pd.DataFrame(self.buffer.values[order], index=index, columns=self.buffer.columns)
+            partial = self.partial
+        hist['Volume'] = hist['Volume'].astype('int64')
+        if partial is not None and (since is None or partial.index[-1] > since):
+            hist = pd.concat([hist, partial[COLUMNS]])
+        return hist
+
+    def run(self):
+        while time.monotonic() - self.last_read < IDLE_TIMEOUT:
+            # Wake just after each poll boundary so closed bars are picked up promptly
+            time.sleep(POLL_SECONDS - time.time() % POLL_SECONDS + 2)
+            try:
+                self.poll()
+                self.error = None
+            except Exception as e:
+                self.error = str(e)
+        with _feeds_lock:
+            if _feeds.get(self.key) is self:
+                del _feeds[self.key]
+
+    @property
+    def key(self):
+        return (self.ticker_symbol, self.interval, tuple(self.indicators))
+
+    def start(self):
+        # A dedicated daemon thread rather than the shared pool, since it runs until idle
+        self._thread = threading.Thread(target=self.run, name=f"live-{self.ticker_symbol}-{self.interval}", daemon=True)
+        self._thread.start()
+
+
+def get_feed(ticker_symbol, interval, indicators):
+    if interval not in INTERVAL_SECONDS:
+        raise ValueError(f"Unsupported live interval '{interval}'")
+    indicators = [name for name in INDICATORS if name in indicators]
+    key = (ticker_symbol, interval, tuple(indicators))
+    with _feeds_lock:
+        feed = _feeds.get(key)
+        if feed is None:
+            feed = _feeds[key] = LiveFeed(ticker_symbol, interval, indicators)
+            leader = True
+        else:
+            leader = False
+    if leader:
+        try:
+            feed.seed()
+        except Exception:
+            with _feeds_lock:
+                _feeds.pop(key, None)
+            raise
+        feed.start()
+    else:
+        # Wait for the session that is seeding this feed
+        while feed.buffer is None and _feeds.get(key) is feed:
+            time.sleep(0.05)
+        if feed.buffer is None:
+            raise LookupError(f"No intraday data for '{ticker_symbol}' at {interval}.")
+    feed.last_read = time.monotonic()
+    return feed
+
+
+def live_feeds():
+    with _feeds_lock:
+        return {f"{t} {i}": {"bars": len(feed.buffer) if feed.buffer else 0, "version": feed.version, "error": feed.error}
+                for (t, i, _), feed in _feeds.items()}
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import metrics
+import store
+
+# LLM gateway: one pooled Groq client, a disk cache shared by every session
+# and de-duplication of identical requests that are in flight together.
+DEFAULT_MODEL = "llama3-8b-8192"
+CACHE_PATH = os.getenv("MARKETMIND_LLM_CACHE", os.path.join(store.STORE_DIR, "llm_cache.sqlite3"))
+CACHE_MAX_ENTRIES = int(os.getenv("MARKETMIND_LLM_CACHE_SIZE", "5000"))
+TTLS = {
+    "fundamental": int(os.getenv("MARKETMIND_TTL_FUNDAMENTAL", str(24 * 3600))),
+    "sentiment": int(os.getenv("MARKETMIND_TTL_SENTIMENT", str(6 * 3600))),
+}
+DEFAULT_TTL = 6 * 3600
+
+_client = None
+_client_lock = threading.Lock()
+_inflight = {}
+_inflight_lock = threading.Lock()
+_env_loaded = False
+
+
+def load_env():
+    # Reads .env once per process: at app start, or on the first call that needs an API key
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+def api_key():
+    load_env()
+    return os.getenv("GROQ_API_KEY")
+
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                key = api_key()
+                if not key:
+                    return None
+                # The Groq SDK is imported only when the first LLM request is made
+                from groq import Groq
+                _client = Groq(api_key=key, base_url=os.getenv("GROQ_BASE_URL") or None)
+    return _client
+
+
+def trading_day():
+    return datetime.now(ZoneInfo("Asia/Kolkata")).date().isoformat()
+
+
+class ResponseCache:
+    def __init__(self, path=CACHE_PATH, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT, created REAL, accessed REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        return self._conn
+
+    def get(self, key, ttl):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            conn.commit()
+            return row[0]
+
+    def put(self, key, value):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, value, now, now))
+            # Evict the least recently used entries beyond the size bound
+            conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            conn.commit()
+
+
+_cache = ResponseCache()
+
+
+def cache_key(symbol, template, model, **params):
+    template_hash = hashlib.sha256(template.encode()).hexdigest()[:16]
+    source = json.dumps([symbol.upper(), template_hash, model, trading_day(), sorted(params.items())])
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def complete(kind, symbol, template, model=DEFAULT_MODEL, max_tokens=500, temperature=0.7, ttl=None):
+    ttl = TTLS.get(kind, DEFAULT_TTL) if ttl is None else ttl
+    key = cache_key(symbol, template, model, max_tokens=max_tokens, temperature=temperature)
+    cached = _cache.get(key, ttl)
+    if cached is not None:
+        metrics.inc("llm_cache_hits", kind=kind)
+        return cached
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+    if not leader:
+        metrics.inc("llm_coalesced", kind=kind)
+        return future.result()
+
+    try:
+        cached = _cache.get(key, ttl)
+        if cached is not None:
+            future.set_result(cached)
+            return cached
+        client = get_client()
+        if client is None:
+            raise RuntimeError("Groq API key not found in .env file")
+        with metrics.span("llm", kind=kind):
+            completion = client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": template.format(symbol=symbol)}],
+                max_tokens=max_tokens,
+                temperature=temperature
+            )
+        usage = getattr(completion, "usage", None)
+        if usage is not None:
+            metrics.inc("llm_prompt_tokens", usage.prompt_tokens or 0, kind=kind)
+            metrics.inc("llm_completion_tokens", usage.completion_tokens or 0, kind=kind)
+        response = completion.choices[0].message.content.strip()
+        _cache.put(key, response)
+        future.set_result(response)
+        return response
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
@@ -0,0 +1,213 @@
+import csv
+import glob
+import hashlib
+import importlib.util
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from metrics import span
+
+# Offline sentiment: headlines from a local news feed are scored in batches
+# by a vectorized word lexicon (or TextBlob), each headline is scored once
+# and memoized by its hash, and scores roll up into per-symbol daily series.
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+LEXICON_FILE = os.getenv("MARKETMIND_LEXICON", os.path.join(DATA_DIR, "sentiment_lexicon.csv"))
+# A CSV/JSONL file, or a directory of them, with date, symbol and headline fields
+NEWS_PATH = os.getenv("MARKETMIND_NEWS_PATH", os.path.join(DATA_DIR, "news"))
+SCORER = os.getenv("MARKETMIND_LOCAL_SCORER", "lexicon")
+MEMO_SIZE = int(os.getenv("MARKETMIND_SENTIMENT_MEMO", "200000"))
+PROCESS_THRESHOLD = int(os.getenv("MARKETMIND_SENTIMENT_PROCESS_THRESHOLD", "20000"))
+RECENT_HEADLINES = 20
+NEUTRAL_BAND = 0.05
+NEGATIONS = {"not", "no", "never", "without", "fails", "failed"}
+TOKEN = r"[a-z][a-z'-]*"
+
+
+def load_lexicon(path=LEXICON_FILE):
+    lexicon = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            lexicon[row['word'].strip().lower()] = float(row['score'])
+    return lexicon
+
+
+def lexicon_scores(headlines, lexicon):
+    # Mean polarity of the lexicon words in each headline; a negation flips the word after it
+    tokens = pd.Series(list(headlines), dtype=object).str.lower().str.findall(TOKEN).explode()
+    rows = tokens.index.to_numpy()
+    polarity = tokens.map(lexicon).fillna(0.0).to_numpy(dtype='float64')
+    negated = tokens.isin(NEGATIONS).to_numpy()
+    after_negation = np.r_[False, negated[:-1] & (rows[1:] == rows[:-1])]
+    polarity = np.where(after_negation, -polarity, polarity)
+    total = np.bincount(rows, weights=polarity, minlength=len(headlines))
+    matched = np.bincount(rows, weights=polarity != 0, minlength=len(headlines))
+    return np.where(matched > 0, total / np.maximum(matched, 1), 0.0)
+
+
+def textblob_available():
+    return importlib.util.find_spec("textblob") is not None
+
+
+def textblob_scores(headlines):
+    # TextBlob (and its NLTK corpora) load only when this scorer is used
+    try:
+        from textblob import TextBlob
+    except ImportError:
+        raise RuntimeError("The textblob scorer needs textblob installed") from None
+    return np.array([TextBlob(headline).sentiment.polarity for headline in headlines], dtype='float64')
+
+
+def score_batch(scorer, headlines, lexicon):
+    if scorer == "textblob":
+        return textblob_scores(headlines)
+    return lexicon_scores(headlines, lexicon)
+
+
+def _score_chunk(args):
+    return score_batch(*args)
+
+
+def headline_key(scorer, headline):
+    return hashlib.blake2b(f"{scorer}\0{headline.strip().lower()}".encode(), digest_size=12).digest()
+
+
+class SentimentEngine:
+    def __init__(self, scorer=SCORER, lexicon_path=LEXICON_FILE, memo_size=MEMO_SIZE, process_threshold=PROCESS_THRESHOLD):
+        self.scorer = scorer
+        self.lexicon = load_lexicon(lexicon_path) if scorer == "lexicon" else {}
+        self.memo_size = memo_size
+        self.process_threshold = process_threshold
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    def score(self, headlines):
+        headlines = list(headlines)
+        keys = [headline_key(self.scorer, headline) for headline in headlines]
+        with self._lock:
+            known = {key: self._memo[key] for key in keys if key in self._memo}
+        # Only headlines never seen before are scored, each once
+        pending = {}
+        for key, headline in zip(keys, headlines):
+            if key not in known and key not in pending:
+                pending[key] = headline
+        if pending:
+            with span("sentiment_score", scorer=self.scorer):
+                scores = self._score_new(list(pending.values()))
+            fresh = dict(zip(pending, scores.tolist()))
+            known.update(fresh)
+            with self._lock:
+                self._memo.update(fresh)
+                while len(self._memo) > self.memo_size:
+                    self._memo.popitem(last=False)
+        return np.array([known[key] for key in keys], dtype='float64')
+
+    def _score_new(self, headlines):
+        if len(headlines) < self.process_threshold:
+            return score_batch(self.scorer, headlines, self.lexicon)
+        # Large batches are split across processes, one chunk per core
+        workers = os.cpu_count() or 1
+        size = -(-len(headlines) // workers)
+        jobs = [(self.scorer, headlines[i:i + size], self.lexicon) for i in range(0, len(headlines), size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return np.concatenate(list(executor.map(_score_chunk, jobs)))
+
+
+class NewsFeed:
+    def __init__(self, path=NEWS_PATH):
+        self.path = path
+        self._signature = None
+        self._frame = pd.DataFrame(columns=["date", "symbol", "headline"])
+        self._lock = threading.Lock()
+
+    def files(self):
+        if os.path.isdir(self.path):
+            return sorted(glob.glob(os.path.join(self.path, "*.csv")) + glob.glob(os.path.join(self.path, "*.jsonl")))
+        return [self.path] if os.path.exists(self.path) else []
+
+    def frame(self):
+        # Re-read only when a feed file was added, removed or modified
+        files = self.files()
+        signature = tuple((path, os.path.getmtime(path)) for path in files)
+        with self._lock:
+            if signature != self._signature:
+                self._frame = self._read(files)
+                self._signature = signature
+            return self._frame
+
+    def _read(self, files):
+        frames = []
+        for path in files:
+            if path.endswith(".jsonl"):
+                with open(path, encoding='utf-8') as f:
+                    frames.append(pd.DataFrame([json.loads(line) for line in f if line.strip()]))
+            else:
+                frames.append(pd.read_csv(path))
+        if not frames:
+            return pd.DataFrame(columns=["date", "symbol", "headline"])
+        news = pd.concat(frames, ignore_index=True)[["date", "symbol", "headline"]].dropna()
+        news["date"] = pd.to_datetime(news["date"]).dt.normalize()
+        news["symbol"] = news["symbol"].astype(str).str.strip().str.upper()
+        return news.sort_values("date", ascending=False, kind="stable").reset_index(drop=True)
+
+    def headlines(self, symbol):
+        news = self.frame()
+        return news[news["symbol"] == symbol.strip().upper()]
+
+
+_engine = None
+_feed = None
+_singleton_lock = threading.Lock()
+
+
+def get_engine():
+    global _engine
+    with _singleton_lock:
+        if _engine is None:
+            _engine = SentimentEngine()
+        return _engine
+
+
+def get_feed():
+    global _feed
+    with _singleton_lock:
+        if _feed is None:
+            _feed = NewsFeed()
+        return _feed
+
+
+def label(score):
+    return "Positive" if score > NEUTRAL_BAND else "Negative" if score < -NEUTRAL_BAND else "Neutral"
+
+
+def daily_sentiment(symbol, feed=None, engine=None):
+    # One row per day: mean headline score and headline count
+    news = (feed or get_feed()).headlines(symbol)
+    if news.empty:
+        return pd.DataFrame(columns=["score", "headlines"])
+    scores = (engine or get_engine()).score(news["headline"])
+    daily = pd.DataFrame({"date": news["date"].to_numpy(), "score": scores}).groupby("date")["score"].agg(["mean", "count"])
+    return daily.rename(columns={"mean": "score", "count": "headlines"})
+
+
+def analyze(symbol):
+    # Same shape as sentiment.perform_sentiment_analysis, plus the daily series
+    try:
+        news = get_feed().headlines(symbol).head(RECENT_HEADLINES)
+        scores = get_engine().score(news["headline"]) if not news.empty else np.empty(0)
+        headlines = [f"{headline} - {label(score)}" for headline, score in zip(news["headline"].head(3), scores[:3])]
+        while len(headlines) < 3:
+            headlines.append(f"No recent news available for {symbol} - Neutral")
+        return {
+            "symbol": symbol,
+            "sentiment": label(scores.mean()) if len(scores) else "Neutral",
+            "headlines": headlines,
+            "daily": daily_sentiment(symbol),
+        }
+    except Exception as e:
+        return {"error": f"Error performing local sentiment analysis: {e}"}
@@ -0,0 +1,159 @@
+import contextvars
+import cProfile
+import functools
+import os
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import store
+
+# Process-wide instrumentation: timing spans recorded into histograms,
+# counters, and collectors that report other modules' own counters. Spans
+# carry the trace id of the Streamlit rerun (or API request) that started
+# them, so the debug panel can show one rerun's breakdown.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RECENT_SPANS = int(os.getenv("MARKETMIND_RECENT_SPANS", "500"))
+# Comma separated span names to run under cProfile, or "all"
+PROFILE = {name.strip() for name in os.getenv("MARKETMIND_PROFILE", "").split(",") if name.strip()}
+PROFILE_DIR = os.getenv("MARKETMIND_PROFILE_DIR", os.path.join(store.STORE_DIR, "profiles"))
+
+_trace = contextvars.ContextVar("marketmind_trace", default=None)
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_collectors = {}
+_hooks = []
+_recent = deque(maxlen=RECENT_SPANS)
+_trace_ids = iter(range(1, 1 << 62))
+
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items())))
+
+
+def start_trace():
+    with _lock:
+        trace_id = next(_trace_ids)
+    _trace.set(trace_id)
+    return trace_id
+
+
+def current_trace():
+    return _trace.get()
+
+
+def inc(name, value=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, seconds, **labels):
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = {"count": 0, "sum": 0.0, "max": 0.0, "buckets": [0] * len(BUCKETS)}
+        hist["count"] += 1
+        hist["sum"] += seconds
+        hist["max"] = max(hist["max"], seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                hist["buckets"][i] += 1
+        _recent.append((_trace.get(), name, labels, seconds, time.time()))
+    for hook in _hooks:
+        hook(name, seconds, labels)
+
+
+@contextmanager
+def span(name, **labels):
+    profiler = cProfile.Profile() if name in PROFILE or "all" in PROFILE else None
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+            _save_profile(name, profiler)
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def timed(name, **labels):
+    # Decorator form of span()
+    def wrap(fn):
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            with span(name, **labels):
+                return fn(*args, **kwargs)
+        return run
+    return wrap
+
+
+def _save_profile(name, profiler):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{threading.get_ident()}.prof")
+    pstats.Stats(profiler).dump_stats(path)
+
+
+def add_hook(hook):
+    # hook(name, seconds, labels) is called after every span, e.g. to forward to an external tracer
+    _hooks.append(hook)
+
+
+def register_collector(name, collect):
+    # collect() returns a flat dict of numbers, reported as marketmind_<name>_<key>
+    _collectors[name] = collect
+
+
+def trace_spans(trace_id):
+    with _lock:
+        return [(name, labels, seconds) for tid, name, labels, seconds, _ in _recent if tid == trace_id]
+
+
+def snapshot():
+    with _lock:
+        counters = [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in _counters.items()]
+        spans = [{"name": name, "labels": dict(labels), "count": h["count"], "sum": h["sum"], "max": h["max"]}
+                 for (name, labels), h in _histograms.items()]
+    collected = {name: collect() for name, collect in list(_collectors.items())}
+    return {"counters": counters, "spans": spans, "collectors": collected}
+
+
+def _labels_text(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{str(v)}"' for k, v in pairs) + "}"
+
+
+def prometheus_text():
+    lines = []
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((k, dict(h, buckets=list(h["buckets"]))) for k, h in _histograms.items())
+    names = set()
+    for (name, labels), value in counters:
+        metric = f"marketmind_{name}_total"
+        if metric not in names:
+            names.add(metric)
+            lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric}{_labels_text(labels)} {value}")
+    if histograms:
+        lines.append("# TYPE marketmind_span_seconds histogram")
+    for (name, labels), h in histograms:
+        labels = (("span", name),) + labels
+        for bound, count in zip(BUCKETS, h["buckets"]):
+            lines.append(f"marketmind_span_seconds_bucket{_labels_text(labels, [('le', bound)])} {count}")
+        lines.append(f"marketmind_span_seconds_bucket{_labels_text(labels, [('le', '+Inf')])} {h['count']}")
+        lines.append(f"marketmind_span_seconds_sum{_labels_text(labels)} {h['sum']}")
+        lines.append(f"marketmind_span_seconds_count{_labels_text(labels)} {h['count']}")
+    for name, collect in sorted(_collectors.items()):
+        for key, value in collect().items():
+            if isinstance(value, (int, float)):
+                lines.append(f"marketmind_{name}_{key} {value}")
+    return "\n".join(lines) + "\n"
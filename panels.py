@@ -0,0 +1,60 @@
+import importlib
+import sys
+import threading
+import time
+from collections import namedtuple
+
+import metrics
+
+# Optional app panels, registered by module path. A panel's module, and the
+# heavy libraries it pulls in (plotly, the Groq SDK, yfinance's screener
+# path), is imported the first time the panel is enabled rather than when
+# the app starts, and that import is timed as an "import" span.
+Panel = namedtuple("Panel", ["key", "module", "title"])
+
+_panels = {}
+_import_seconds = {}
+_lock = threading.Lock()
+
+
+def register(key, module, title):
+    _panels[key] = Panel(key, module, title)
+
+
+def panels():
+    return dict(_panels)
+
+
+def is_loaded(key):
+    return _panels[key].module in sys.modules
+
+
+def load(key, *attributes):
+    # Imports the panel's module once; returns the module, or the named attributes from it
+    panel = _panels[key]
+    module = sys.modules.get(panel.module)
+    if module is None:
+        with _lock:
+            module = sys.modules.get(panel.module)
+            if module is None:
+                start = time.perf_counter()
+                with metrics.span("import", panel=key):
+                    module = importlib.import_module(panel.module)
+                _import_seconds[key] = time.perf_counter() - start
+    if not attributes:
+        return module
+    values = tuple(getattr(module, name) for name in attributes)
+    return values[0] if len(values) == 1 else values
+
+
+def import_times():
+    # Seconds each panel's first import took in this process
+    return dict(_import_seconds)
+
+
+register("charts", "charts", "Price and volume charts")
+register("sentiment", "sentiment", "Sentiment analysis")
+register("fundamental", "fundamental", "Fundamental analysis")
+register("screener", "screener", "Watchlist screener")
+register("live", "live", "Live intraday chart")
+register("factors", "factors", "Factor screener")
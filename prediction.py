@@ -1,29 +1,176 @@
-import pandas as pd
+import os
+import threading
 import numpy as np
-from sklearn.linear_model import LinearRegression
-from textblob import TextBlob
+import pandas as pd
+import store
+import local_sentiment
 
-def process_data(hist):
-    try:
-        if hist is not None and not hist.empty:
-            hist['Prev_Close'] = hist['Close'].shift(1)
-            hist.dropna(inplace=True)
+# Linear direction model kept as running sufficient statistics (X'X and X'y),
+# so a new bar costs O(lags^2) instead of a refit over the whole history.
+DEFAULT_LAGS = 3
+
+
+class OnlineModel:
+    __slots__ = ("lags", "xtx", "xty", "n", "tail", "first_bar", "last_bar")
+
+    def __init__(self, lags=DEFAULT_LAGS):
+        self.lags = lags
+        self.xtx = np.zeros((lags + 1, lags + 1))
+        self.xty = np.zeros(lags + 1)
+        self.n = 0
+        self.tail = np.empty(0)
+        self.first_bar = None
+        self.last_bar = None
+
+    @staticmethod
+    def design(close, lags):
+        # Row t holds [1, close[t], close[t-1], ...]; the lag columns are a strided view of close
+        windows = np.lib.stride_tricks.sliding_window_view(close, lags)[:, ::-1]
+        return np.hstack([np.ones((len(windows), 1)), windows])
+
+    def fit(self, close, last_bar=None, first_bar=None):
+        close = np.asarray(close, dtype='float64')
+        self.__init__(self.lags)
+        if len(close) > self.lags:
+            X = self.design(close[:-1], self.lags)
+            y = (close[self.lags:] > close[self.lags - 1:-1]).astype('float64')
+            self.xtx = X.T @ X
+            self.xty = X.T @ y
+            self.n = len(y)
+        self.tail = close[-self.lags:].copy()
+        self.first_bar = first_bar
+        self.last_bar = last_bar
+        return self
+
+    def update(self, x, last_bar=None):
+        if len(self.tail) == self.lags:
+            features = np.concatenate([[1.0], self.tail[::-1]])
+            self.xtx += np.outer(features, features)
+            self.xty += features * float(x > self.tail[-1])
+            self.n += 1
+        self.tail = np.append(self.tail, x)[-self.lags:]
+        self.last_bar = last_bar
+        return self
+
+    def coef(self):
+        # Least squares from the normal equations; the minimum-norm solution when X'X is singular
+        return np.linalg.lstsq(self.xtx, self.xty, rcond=None)[0]
+
+    def features(self):
+        if len(self.tail) < self.lags:
+            return None
+        return np.concatenate([[1.0], self.tail[::-1]])
+
+    def predict(self):
+        features = self.features()
+        return None if features is None or self.n == 0 else float(features @ self.coef())
+
+    def save(self, path):
+        # Written aside and renamed, so concurrent requests never read a half-written file
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+        np.savez(tmp, lags=self.lags, xtx=self.xtx, xty=self.xty, n=self.n, tail=self.tail,
+                 first_bar=np.array([] if self.first_bar is None else [self.first_bar], dtype='int64'),
+                 last_bar=np.array([] if self.last_bar is None else [self.last_bar], dtype='int64'))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as state:
+            model = cls(int(state['lags']))
+            model.xtx, model.xty, model.n, model.tail = state['xtx'], state['xty'], int(state['n']), state['tail']
+            model.first_bar = int(state['first_bar'][0]) if len(state['first_bar']) else None
+            model.last_bar = int(state['last_bar'][0]) if len(state['last_bar']) else None
+        return model
 
-            X = hist['Prev_Close'].values.reshape(-1, 1)
-            y = (hist['Close'].shift(-1) > hist['Close']).astype(int).dropna().values
 
-            model = LinearRegression()
-            model.fit(X, y)
+def model_path(ticker_symbol, lags=DEFAULT_LAGS, period="max"):
+    return os.path.join(store.partition_path(ticker_symbol), f"model_lags{lags}_{period}.npz")
 
-            last_close = hist['Close'].iloc[-1]
-            prediction = model.predict(np.array([[last_close]]))
-            direction = "📈 Bullish" if prediction[0] > 0.5 else "📉 Bearish"
-            return direction, hist.tail(10)
+
+def fitted_model(hist, lags=DEFAULT_LAGS, ticker_symbol=None, period="max"):
+    # Reuse the persisted statistics when hist starts at the same bar and extends the bars they were built from
+    close = hist['Close'].to_numpy(dtype='float64')
+    bars = hist.index.asi8 if isinstance(hist.index, pd.DatetimeIndex) else None
+    model = None
+    if ticker_symbol and bars is not None:
+        try:
+            model = OnlineModel.load(model_path(ticker_symbol, lags, period))
+        except (OSError, ValueError, KeyError):
+            model = None
+    start = None
+    if model is not None and model.last_bar is not None and bars is not None and len(bars) and model.first_bar == bars[0]:
+        position = np.searchsorted(bars, model.last_bar)
+        if position < len(bars) and bars[position] == model.last_bar and close[position] == model.tail[-1]:
+            start = position + 1
+    if start is None:
+        model = OnlineModel(lags).fit(close, *((None, None) if bars is None or not len(bars) else (int(bars[-1]), int(bars[0]))))
+    else:
+        for i in range(start, len(close)):
+            model.update(close[i], int(bars[i]))
+    # Only write when the statistics changed: a fresh fit or at least one new bar
+    if ticker_symbol and bars is not None and (start is None or start < len(close)):
+        os.makedirs(store.partition_path(ticker_symbol), exist_ok=True)
+        model.save(model_path(ticker_symbol, lags, period))
+    return model
+
+
+def process_data(hist, lags=DEFAULT_LAGS, ticker_symbol=None, period="max"):
+    try:
+        if hist is not None and len(hist) > lags + 1:
+            model = fitted_model(hist, lags, ticker_symbol, period)
+            prediction = model.predict()
+            direction = "📈 Bullish" if prediction > 0.5 else "📉 Bearish"
+            # Only the last rows are copied to attach the lag columns
+            tail = hist.tail(10)
+            close = hist['Close'].iloc[-(10 + lags):]
+            lagged = {"Prev_Close" if k == 1 else f"Close_Lag{k}": close.shift(k).iloc[-len(tail):] for k in range(1, lags + 1)}
+            return direction, tail.assign(**lagged)
         else:
             return None, None
     except Exception as e:
         raise Exception(f"Error processing data: {e}")
 
+
+def score_universe(models):
+    # models maps ticker -> OnlineModel; all tickers are scored in one batched product
+    tickers = [t for t, m in models.items() if m.n > 0 and m.features() is not None]
+    if not tickers:
+        return {}
+    lags = {models[t].lags for t in tickers}
+    if len(lags) != 1:
+        raise ValueError("All models must use the same number of lags")
+    coefs = np.stack([models[t].coef() for t in tickers])
+    features = np.stack([models[t].features() for t in tickers])
+    return dict(zip(tickers, np.einsum('ij,ij->i', coefs, features)))
+
+
+def fit_universe(close_matrix, lags=DEFAULT_LAGS):
+    # Batched fit for a (bars x tickers) matrix without gaps: X'X and X'y for every ticker in one einsum each
+    close_matrix = np.asarray(close_matrix, dtype='float64')
+    windows = np.lib.stride_tricks.sliding_window_view(close_matrix[:-1], lags, axis=0)[..., ::-1]
+    X = np.concatenate([np.ones(windows.shape[:2] + (1,)), windows], axis=2)
+    y = (close_matrix[lags:] > close_matrix[lags - 1:-1]).astype('float64')
+    models = []
+    xtx = np.einsum('tni,tnj->nij', X, X)
+    xty = np.einsum('tni,tn->ni', X, y)
+    for i in range(close_matrix.shape[1]):
+        model = OnlineModel(lags)
+        model.xtx, model.xty, model.n, model.tail = xtx[i], xty[i], len(y), close_matrix[-lags:, i].copy()
+        models.append(model)
+    return models
+
+
+_headline_engine = None
+
+
+def headline_engine():
+    # TextBlob polarity as before when it is installed, the lexicon otherwise
+    global _headline_engine
+    if _headline_engine is None:
+        _headline_engine = local_sentiment.SentimentEngine(scorer="textblob" if local_sentiment.textblob_available() else "lexicon")
+    return _headline_engine
+
+
 def perform_sentiment_analysis(symbol):
     news_headlines = [
         f"{symbol} sees an upward trend amidst market optimism.",
@@ -31,12 +178,8 @@ def perform_sentiment_analysis(symbol):
         f"Investors stay bullish on {symbol}."
     ]
 
-    sentiments = []
-    for headline in news_headlines:
-        analysis = TextBlob(headline)
-        sentiments.append(analysis.sentiment.polarity)
-
-    avg_sentiment = sum(sentiments) / len(sentiments)
+    # Scored in one batch, memoized across calls
+    avg_sentiment = float(headline_engine().score(news_headlines).mean())
     sentiment_category = "😊 Positive" if avg_sentiment > 0 else "😟 Negative" if avg_sentiment < 0 else "😐 Neutral"
 
     return sentiment_category, news_headlines
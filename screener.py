@@ -0,0 +1,124 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+import store
+from fetcher import YAHOO_HOST, scheduler
+from indicators import rolling_mean_matrix, rsi_matrix
+
+# Watchlist screener: downloads tickers in batches over a small thread pool
+# and computes indicators for all of them at once on (bars x tickers) arrays.
+BATCH_SIZE = int(os.getenv("MARKETMIND_SCREENER_BATCH", "50"))
+MAX_WORKERS = int(os.getenv("MARKETMIND_SCREENER_WORKERS", "4"))
+SCREENER_COLUMNS = ['Symbol', 'Last Close', '% Change', 'RSI', 'MA Distance %', 'Signal', 'Signal Date']
+
+# One finished batch: its rows, the symbols it has no rows for, and why the whole batch failed if it did
+BatchResult = namedtuple("BatchResult", ["table", "skipped", "error"])
+
+
+def ticker_symbol(symbol, exchange):
+    suffix = ".NS" if exchange.upper() == "NSE" else ".BO"
+    return f"{symbol.strip().upper()}{suffix}"
+
+
+def download_batch(tickers, period):
+    # Serve what the local store already has for today, download the rest in one call
+    frames = {}
+    missing = []
+    for ticker in tickers:
+        stored, meta = store.read_partition(ticker)
+        if stored is not None and store.covers(meta, period) and store.checked_today(meta):
+            frames[ticker] = store.slice_period(stored, period)
+        else:
+            missing.append(ticker)
+    if not missing:
+        return frames
+    data = scheduler.call(YAHOO_HOST, lambda: yf.download(missing, period=period, group_by='ticker', auto_adjust=True, threads=False, progress=False))
+    if data is None or data.empty:
+        return frames
+    if not isinstance(data.columns, pd.MultiIndex):
+        data.columns = pd.MultiIndex.from_product([missing, data.columns])
+    # yf.download drops the timezone of daily bars; the store and fetch_history keep exchange time
+    data = store.localize(data)
+    fetched_from = "max" if period == "max" else store.period_start(period).date().isoformat()
+    for ticker in missing:
+        if ticker not in data.columns.get_level_values(0):
+            continue
+        hist = data[ticker][store.COLUMNS].dropna(how='all')
+        if hist.empty:
+            continue
+        if hist.index.duplicated().any():
+            hist = hist[~hist.index.duplicated(keep='first')]
+        stored, meta = store.read_partition(ticker)
+        covered_from = fetched_from
+        # Older bars are kept only when they reach the fresh ones and share their split/dividend adjustment
+        if stored is not None and not stored.empty and stored.index[-1] >= hist.index[0] and not store.readjusted(stored, hist):
+            covered_from = store.wider_coverage(meta.get("covered_from"), fetched_from)
+            hist = store.merge(stored, hist)
+        store.write_partition(ticker, hist, covered_from)
+        frames[ticker] = store.slice_period(hist, period)
+    return frames
+
+
+def align_close(frames):
+    tickers = list(frames)
+    closes = pd.concat({ticker: frames[ticker]['Close'] for ticker in tickers}, axis=1).sort_index()
+    return tickers, closes.index, closes.to_numpy(dtype='float64')
+
+
+def screen_frames(frames, fast=50, slow=200):
+    if not frames:
+        return pd.DataFrame(columns=SCREENER_COLUMNS)
+    tickers, dates, close = align_close(frames)
+    # Carry the last close over dates a ticker did not trade so every column shares one calendar
+    close = pd.DataFrame(close).ffill().to_numpy()
+    last_close = close[-1]
+    prev_close = close[-2] if len(close) > 1 else np.full(len(tickers), np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change = (last_close / prev_close - 1) * 100
+        ma_distance = (last_close / rolling_mean_matrix(close, 20)[-1] - 1) * 100
+    rsi = rsi_matrix(close)[-1]
+
+    spread = rolling_mean_matrix(close, fast, min_periods=1) - rolling_mean_matrix(close, slow, min_periods=1)
+    buy = np.zeros(close.shape, dtype=bool)
+    sell = np.zeros(close.shape, dtype=bool)
+    buy[1:] = (spread[:-1] < 0) & (spread[1:] > 0)
+    sell[1:] = (spread[:-1] > 0) & (spread[1:] < 0)
+    crossed = buy | sell
+    has_signal = crossed.any(axis=0)
+    signal_rows = len(close) - 1 - np.argmax(crossed[::-1], axis=0)
+    cols = np.arange(len(tickers))
+    signal = np.where(~has_signal, "None", np.where(buy[signal_rows, cols], "Buy", "Sell"))
+    signal_dates = [dates[row].strftime('%Y-%m-%d') if ok else "" for row, ok in zip(signal_rows, has_signal)]
+
+    return pd.DataFrame({
+        'Symbol': [ticker.rsplit('.', 1)[0] for ticker in tickers],
+        'Last Close': last_close,
+        '% Change': change,
+        'RSI': rsi,
+        'MA Distance %': ma_distance,
+        'Signal': signal,
+        'Signal Date': signal_dates,
+    })
+
+
+def run_screener(symbols, exchange="NSE", period="1y", batch_size=BATCH_SIZE, max_workers=MAX_WORKERS):
+    # Yields one BatchResult per batch, in completion order
+    tickers = list(dict.fromkeys(ticker_symbol(symbol, exchange) for symbol in symbols if symbol.strip()))
+    batches = [tickers[i:i + batch_size] for i in range(0, len(tickers), batch_size)]
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="screener") as executor:
+        futures = {executor.submit(download_batch, batch, period): batch for batch in batches}
+        for future in as_completed(futures):
+            symbols = [ticker.rsplit('.', 1)[0] for ticker in futures[future]]
+            try:
+                frames = future.result()
+                table = screen_frames(frames)
+            except Exception as e:
+                yield BatchResult(pd.DataFrame(columns=SCREENER_COLUMNS), symbols, str(e))
+                continue
+            skipped = [symbol for ticker, symbol in zip(futures[future], symbols) if ticker not in frames]
+            yield BatchResult(table, skipped, None)
@@ -1,42 +1,33 @@
-from groq import Groq
 import re
 import os
-from dotenv import load_dotenv
+import llm
+import local_sentiment
 
-# Load environment variables
-load_dotenv()
+# "groq" asks the LLM; "local" scores headlines from the local news feed offline
+SENTIMENT_BACKEND = os.getenv("MARKETMIND_SENTIMENT_BACKEND", "groq")
 
-def perform_sentiment_analysis(symbol):
-    # Initialize Groq client
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
+# Prompt template for sentiment analysis
+SENTIMENT_PROMPT = (
+    "Perform a sentiment analysis for the stock symbol '{symbol}'. "
+    "Provide an overall sentiment (Positive, Negative, or Neutral) and list 3 recent hypothetical headlines related to the stock with their individual sentiments. "
+    "Format the response as follows:\n"
+    "Overall Sentiment: [Positive/Negative/Neutral]\n"
+    "Headlines:\n"
+    "1. [Headline 1] - [Sentiment]\n"
+    "2. [Headline 2] - [Sentiment]\n"
+    "3. [Headline 3] - [Sentiment]"
+)
+
+def perform_sentiment_analysis(symbol, backend=None):
+    if (backend or SENTIMENT_BACKEND) == "local":
+        return local_sentiment.analyze(symbol)
+
+    if not llm.api_key():
         return {"error": "Groq API key not found in .env file"}
     
-    client = Groq(api_key=api_key)
-    
-    # Prepare the prompt for sentiment analysis
-    prompt = (
-        f"Perform a sentiment analysis for the stock symbol '{symbol}'. "
-        f"Provide an overall sentiment (Positive, Negative, or Neutral) and list 3 recent hypothetical headlines related to the stock with their individual sentiments. "
-        f"Format the response as follows:\n"
-        f"Overall Sentiment: [Positive/Negative/Neutral]\n"
-        f"Headlines:\n"
-        f"1. [Headline 1] - [Sentiment]\n"
-        f"2. [Headline 2] - [Sentiment]\n"
-        f"3. [Headline 3] - [Sentiment]"
-    )
-    
     try:
-        # Call Groq's chat completion API
-        completion = client.chat.completions.create(
-            model="llama3-8b-8192",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=200,
-            temperature=0.7
-        )
-        
-        # Extract the response
-        response = completion.choices[0].message.content.strip()
+        # Served from the shared LLM cache when this symbol was analysed today
+        response = llm.complete("sentiment", symbol, SENTIMENT_PROMPT, max_tokens=200, temperature=0.7)
         
         # Parse the response
         sentiment_match = re.search(r"Overall Sentiment: (Positive|Negative|Neutral)", response)
@@ -0,0 +1,69 @@
+from collections import namedtuple
+
+import numpy as np
+
+# Moving-average crossover signals computed on whole arrays at once.
+# buy/sell hold integer bar positions, so callers map them to dates with
+# hist.index[result.buy] only when they need to display them.
+SignalResult = namedtuple("SignalResult", ["buy", "sell", "accuracy", "fast_ma", "slow_ma"])
+
+DEFAULT_WINDOWS = (50, 200)
+
+
+def rolling_mean(values, window, min_periods=1):
+    values = np.asarray(values, dtype='float64')
+    n = len(values)
+    out = np.full(n, np.nan)
+    if n == 0:
+        return out
+    csum = np.cumsum(values)
+    head = min(window, n)
+    out[:head] = csum[:head] / np.arange(1, head + 1)
+    out[window:] = (csum[window:] - csum[:-window]) / window
+    if min_periods > 1:
+        out[:min(min_periods, n) - 1] = np.nan
+    return out
+
+
+def crossover_points(fast_ma, slow_ma):
+    spread = fast_ma - slow_ma
+    prev, cur = spread[:-1], spread[1:]
+    buy = np.flatnonzero((prev < 0) & (cur > 0)) + 1
+    sell = np.flatnonzero((prev > 0) & (cur < 0)) + 1
+    return buy, sell
+
+
+def follow_through_accuracy(close, buy, sell):
+    # A signal is a hit when the next bar closes in the signal's direction
+    close = np.asarray(close, dtype='float64')
+    total = len(buy) + len(sell)
+    if total == 0:
+        return 0.0
+    step = np.zeros(len(close))
+    step[:-1] = close[1:] - close[:-1]
+    hits = np.count_nonzero(step[buy] > 0) + np.count_nonzero(step[sell] < 0)
+    return hits / total * 100
+
+
+def crossover_signals(close, fast=DEFAULT_WINDOWS[0], slow=DEFAULT_WINDOWS[1], min_bars=None):
+    close = np.asarray(close, dtype='float64')
+    empty = np.empty(0, dtype=np.intp)
+    if len(close) < (min_bars or fast):
+        return SignalResult(empty, empty, 0.0, None, None)
+    fast_ma = rolling_mean(close, fast)
+    slow_ma = rolling_mean(close, slow)
+    buy, sell = crossover_points(fast_ma, slow_ma)
+    return SignalResult(buy, sell, follow_through_accuracy(close, buy, sell), fast_ma, slow_ma)
+
+
+def scan_crossovers(close, window_pairs):
+    close = np.asarray(close, dtype='float64')
+    means = {w: rolling_mean(close, w) for w in {w for pair in window_pairs for w in pair}}
+    results = {}
+    for fast, slow in window_pairs:
+        if len(close) < fast:
+            results[(fast, slow)] = crossover_signals(close[:0], fast, slow)
+            continue
+        buy, sell = crossover_points(means[fast], means[slow])
+        results[(fast, slow)] = SignalResult(buy, sell, follow_through_accuracy(close, buy, sell), means[fast], means[slow])
+    return results
@@ -0,0 +1,170 @@
+import json
+import os
+import threading
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+# Local OHLCV store: one directory per ticker (symbol + exchange suffix),
+# one .npy file per column so reads can be memory-mapped.
+STORE_DIR = os.getenv("MARKETMIND_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".marketmind"))
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+# NSE and BSE bars are dated in exchange time; tz-naive bars (e.g. from yf.download) are taken to be in it
+EXCHANGE_TZ = "Asia/Kolkata"
+
+PERIOD_OFFSETS = {
+    "1d": pd.DateOffset(days=1),
+    "5d": pd.DateOffset(days=5),
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+
+def partition_path(ticker_symbol):
+    return os.path.join(STORE_DIR, "ohlcv", ticker_symbol.upper())
+
+
+def period_start(period, today=None):
+    today = pd.Timestamp(today or date.today())
+    if period == "max":
+        return None
+    if period == "ytd":
+        return pd.Timestamp(year=today.year, month=1, day=1)
+    if period not in PERIOD_OFFSETS:
+        raise ValueError(f"Unsupported period '{period}'")
+    return today - PERIOD_OFFSETS[period]
+
+
+def read_meta(ticker_symbol):
+    path = os.path.join(partition_path(ticker_symbol), "meta.json")
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_partition(ticker_symbol):
+    meta = read_meta(ticker_symbol)
+    if not meta:
+        return None, None
+    path = partition_path(ticker_symbol)
+    try:
+        index = np.load(os.path.join(path, "index.npy"), mmap_mode='r')
+        columns = {col: np.load(os.path.join(path, f"{col}.npy"), mmap_mode='r') for col in COLUMNS}
+    except (OSError, ValueError):
+        return None, None
+    # A partially written partition is treated as missing
+    if len(index) != meta.get("rows") or any(len(arr) != len(index) for arr in columns.values()):
+        return None, None
+    idx = pd.DatetimeIndex(index.view('datetime64[ns]'), name=meta.get("index_name", "Date"))
+    # Partitions written without a timezone hold exchange wall-clock times
+    idx = idx.tz_localize('UTC').tz_convert(meta["tz"]) if meta.get("tz") else idx.tz_localize(EXCHANGE_TZ)
+    hist = pd.DataFrame(columns, index=idx, copy=False)
+    return hist, meta
+
+
+def localize(hist, tz=EXCHANGE_TZ):
+    # Tz-naive bars get the exchange timezone; aware bars are returned unchanged
+    return hist.tz_localize(tz) if hist.index.tz is None else hist
+
+
+def align_tz(stored, fresh):
+    # Puts both frames in stored's timezone so equal bars compare equal and merge into one row
+    stored = localize(stored)
+    fresh = localize(fresh, stored.index.tz)
+    return stored, fresh.tz_convert(stored.index.tz)
+
+
+def write_partition(ticker_symbol, hist, covered_from):
+    path = partition_path(ticker_symbol)
+    os.makedirs(path, exist_ok=True)
+    hist = localize(hist)
+    idx = hist.index
+    tz = str(idx.tz) if idx.tz is not None else None
+    utc = idx.tz_convert('UTC') if tz else idx
+    arrays = {"index": utc.tz_localize(None).values.astype('datetime64[ns]').view('int64')}
+    for col in COLUMNS:
+        arrays[col] = hist[col].to_numpy(dtype='float64' if col != 'Volume' else 'int64')
+    # Temp names are per process and thread; the app, API and screener pools can write one ticker at once
+    suffix = f"{os.getpid()}.{threading.get_ident()}"
+    for name, arr in arrays.items():
+        tmp = os.path.join(path, f".{name}.{suffix}.npy")
+        np.save(tmp, arr)
+        os.replace(tmp, os.path.join(path, f"{name}.npy"))
+    meta = {
+        "rows": len(hist),
+        "tz": tz,
+        "index_name": idx.name or "Date",
+        "covered_from": covered_from,
+        "checked_on": date.today().isoformat(),
+        "updated_at": datetime.now().isoformat(timespec='seconds'),
+    }
+    tmp = os.path.join(path, f".meta.{suffix}.json")
+    with open(tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, os.path.join(path, "meta.json"))
+    return meta
+
+
+def covers(meta, period):
+    if not meta or not meta.get("covered_from"):
+        return False
+    if meta["covered_from"] == "max":
+        return True
+    start = period_start(period)
+    return start is not None and pd.Timestamp(meta["covered_from"]) <= start
+
+
+def checked_today(meta):
+    return bool(meta) and meta.get("checked_on") == date.today().isoformat()
+
+
+def readjusted(stored, fresh, tolerance=1e-3):
+    # True when Yahoo re-adjusted prices (split or dividend) since stored was written. The stored
+    # last bar may have been saved while still forming, so the bar before it is compared instead.
+    if stored is None or len(stored) < 2 or fresh is None or fresh.empty:
+        return False
+    stored, fresh = align_tz(stored, fresh)
+    bar = stored.index[-2]
+    if bar not in fresh.index:
+        return False
+    old_close, new_close = stored['Close'].iloc[-2], fresh.loc[bar, 'Close']
+    return bool(old_close) and abs(new_close - old_close) / old_close > tolerance
+
+
+def wider_coverage(covered, other):
+    # The earlier of two covered_from values; "max" covers everything
+    if "max" in (covered, other):
+        return "max"
+    known = [value for value in (covered, other) if value]
+    return min(known) if known else None
+
+
+def merge(stored, fresh):
+    if stored is None or stored.empty:
+        return fresh
+    if fresh is None or fresh.empty:
+        return stored
+    stored, fresh = align_tz(stored, fresh)
+    # Fresh bars come first so they win the de-duplication below
+    hist = pd.concat([fresh[COLUMNS], stored[COLUMNS]])
+    if hist.index.duplicated().any():
+        hist = hist[~hist.index.duplicated(keep='first')]
+    return hist.sort_index()
+
+
+def slice_period(hist, period):
+    start = period_start(period)
+    if start is None or hist.empty:
+        return hist
+    if hist.index.tz is not None:
+        start = start.tz_localize(hist.index.tz)
+    # Positional slice so the result is a view of the stored arrays
+    return hist.iloc[hist.index.searchsorted(start):]
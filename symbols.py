@@ -0,0 +1,172 @@
+import bisect
+import csv
+import difflib
+import io
+import os
+import sys
+import threading
+import time
+
+import requests
+
+# Symbol master: the NSE/BSE listing held in memory for O(1) validation and
+# prefix/fuzzy search, so only unknown symbols need a network round-trip.
+SYMBOLS_FILE = os.getenv("MARKETMIND_SYMBOLS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "symbols.csv"))
+NSE_LISTING_URL = "https://archives.nseindia.com/content/equities/EQUITY_L.csv"
+NEGATIVE_TTL = int(os.getenv("MARKETMIND_NEGATIVE_TTL", "3600"))
+
+
+class SymbolMaster:
+    def __init__(self, path=SYMBOLS_FILE, negative_ttl=NEGATIVE_TTL):
+        self.path = path
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._negative = {}
+        self._mtime = None
+        self.load()
+
+    def load(self):
+        index = {}
+        try:
+            with open(self.path, newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    symbol = row.get('symbol', '').strip().upper()
+                    exchange = row.get('exchange', '').strip().upper()
+                    if symbol and exchange:
+                        index[(exchange, symbol)] = row.get('name', '').strip()
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        with self._lock:
+            self._index = index
+            self._mtime = mtime
+            self._rebuild()
+
+    def _rebuild(self):
+        self._sorted = {}
+        self._names = {}
+        for (exchange, symbol), name in self._index.items():
+            self._sorted.setdefault(exchange, []).append(symbol)
+            if name:
+                self._names.setdefault(exchange, {})[name.upper()] = symbol
+        for symbols in self._sorted.values():
+            symbols.sort()
+
+    def reload_if_changed(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.load()
+
+    def contains(self, symbol, exchange):
+        return (exchange.upper(), symbol.upper()) in self._index
+
+    def name(self, symbol, exchange):
+        return self._index.get((exchange.upper(), symbol.upper()))
+
+    def add(self, symbol, exchange, name=""):
+        key = (exchange.upper(), symbol.upper())
+        with self._lock:
+            if key not in self._index:
+                self._index[key] = name
+                bisect.insort(self._sorted.setdefault(key[0], []), key[1])
+            self._negative.pop(key, None)
+
+    def mark_invalid(self, symbol, exchange):
+        with self._lock:
+            self._negative[(exchange.upper(), symbol.upper())] = time.monotonic() + self.negative_ttl
+
+    def is_known_invalid(self, symbol, exchange):
+        key = (exchange.upper(), symbol.upper())
+        expires = self._negative.get(key)
+        if expires is None:
+            return False
+        if expires < time.monotonic():
+            with self._lock:
+                self._negative.pop(key, None)
+            return False
+        return True
+
+    def symbols(self, exchange):
+        return list(self._sorted.get(exchange.upper(), []))
+
+    def prefix_search(self, prefix, exchange, limit=10):
+        prefix = prefix.strip().upper()
+        symbols = self._sorted.get(exchange.upper(), [])
+        if not prefix:
+            return []
+        start = bisect.bisect_left(symbols, prefix)
+        matches = []
+        for symbol in symbols[start:]:
+            if not symbol.startswith(prefix) or len(matches) >= limit:
+                break
+            matches.append(symbol)
+        return matches
+
+    def fuzzy_search(self, query, exchange, limit=5, cutoff=0.6):
+        query = query.strip().upper()
+        if not query:
+            return []
+        exchange = exchange.upper()
+        matches = difflib.get_close_matches(query, self._sorted.get(exchange, []), n=limit, cutoff=cutoff)
+        names = self._names.get(exchange, {})
+        for name in difflib.get_close_matches(query, list(names), n=limit, cutoff=cutoff):
+            if names[name] not in matches:
+                matches.append(names[name])
+        return matches[:limit]
+
+    def search(self, query, exchange, limit=5):
+        matches = self.prefix_search(query, exchange, limit)
+        if len(matches) < limit:
+            matches += [m for m in self.fuzzy_search(query, exchange, limit) if m not in matches]
+        return matches[:limit]
+
+
+_master = None
+_master_lock = threading.Lock()
+
+
+def get_symbol_master():
+    global _master
+    if _master is None:
+        with _master_lock:
+            if _master is None:
+                _master = SymbolMaster()
+    else:
+        _master.reload_if_changed()
+    return _master
+
+
+def refresh_symbol_master(path=SYMBOLS_FILE):
+    # Pull the current NSE equity listing and keep the existing BSE rows
+    headers = {"User-Agent": "Mozilla/5.0"}
+    response = requests.get(NSE_LISTING_URL, headers=headers, timeout=30)
+    response.raise_for_status()
+    rows = []
+    for row in csv.DictReader(io.StringIO(response.text)):
+        row = {k.strip(): (v or "").strip() for k, v in row.items() if k}
+        if row.get('SYMBOL'):
+            rows.append((row['SYMBOL'].upper(), "NSE", row.get('NAME OF COMPANY', '')))
+    if not rows:
+        raise ValueError("NSE listing returned no symbols")
+    try:
+        with open(path, newline='', encoding='utf-8') as f:
+            rows += [(r['symbol'], r['exchange'], r.get('name', '')) for r in csv.DictReader(f) if r.get('exchange', '').upper() != "NSE"]
+    except OSError:
+        pass
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['symbol', 'exchange', 'name'])
+        writer.writerows(sorted(set(rows), key=lambda r: (r[1], r[0])))
+    os.replace(tmp, path)
+    return len(rows)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "refresh":
+        print(f"Wrote {refresh_symbol_master()} symbols to {SYMBOLS_FILE}")
+    else:
+        print("Usage: python symbols.py refresh")
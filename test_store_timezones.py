@@ -0,0 +1,85 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import historical
+import screener
+import store
+
+# Regression tests for store partitions written by both the app (fetch_history,
+# tz-aware exchange-time bars) and the screener (yf.download, tz-naive bars).
+TZ = "Asia/Kolkata"
+
+
+def daily_bars(days, tz=TZ):
+    index = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=days, name="Date")
+    # Prices depend on the date only, so overlapping downloads agree
+    close = (index.asi8 // 86_400_000_000_000 % 1000).astype('float64') + 100
+    if tz:
+        index = index.tz_localize(tz)
+    return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                         'Volume': np.full(days, 1000, dtype='int64')}, index=index)
+
+
+def mark_stale(ticker):
+    path = os.path.join(store.partition_path(ticker), "meta.json")
+    with open(path) as f:
+        meta = json.load(f)
+    meta["checked_on"] = "2000-01-01"
+    with open(path, "w") as f:
+        json.dump(meta, f)
+
+
+@pytest.fixture
+def tmp_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "STORE_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def naive_download(monkeypatch):
+    # yf.download returns tz-naive daily bars
+    def download(tickers, period, **kwargs):
+        bars = store.slice_period(daily_bars(600, tz=None), period)
+        return pd.concat({ticker: bars for ticker in tickers}, axis=1)
+    monkeypatch.setattr(screener.yf, "download", download, raising=False)
+
+
+def test_screener_merges_into_app_partition(tmp_store, naive_download):
+    store.write_partition("TCS.NS", daily_bars(400).iloc[:-1], "max")
+    mark_stale("TCS.NS")
+    frames = screener.download_batch(["TCS.NS"], "1y")
+    hist, meta = store.read_partition("TCS.NS")
+    assert "TCS.NS" in frames
+    assert meta["tz"] == TZ and meta["covered_from"] == "max"
+    assert not hist.index.duplicated().any()
+    # The 1y download overlaps the stored bars and adds today's
+    assert hist.index.equals(daily_bars(400).index)
+
+
+def test_watchlist_mixing_app_and_screener_partitions(tmp_store, naive_download):
+    store.write_partition("TCS.NS", daily_bars(400), "max")
+    results = list(screener.run_screener(["TCS", "INFY"], "NSE", "1y"))
+    assert [batch.error for batch in results] == [None]
+    assert sorted(results[0].table['Symbol']) == ["INFY", "TCS"]
+
+
+def test_app_extends_screener_partition(tmp_store, naive_download, monkeypatch):
+    screener.download_batch(["INFY.NS"], "1y")
+    mark_stale("INFY.NS")
+    monkeypatch.setattr(historical, "yahoo_history", lambda ticker, **kwargs: daily_bars(600)[-5:])
+    hist = historical.fetch_history("INFY.NS", "1y")
+    stored, meta = store.read_partition("INFY.NS")
+    assert meta["tz"] == TZ
+    assert not stored.index.duplicated().any()
+    assert len(hist) == len(store.slice_period(daily_bars(600), "1y"))
+
+
+def test_merge_normalizes_naive_bars():
+    stored, fresh = daily_bars(10), daily_bars(10, tz=None)
+    merged = store.merge(stored, fresh)
+    assert len(merged) == 10 and str(merged.index.tz) == TZ
+    assert not store.readjusted(stored, fresh)